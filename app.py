@@ -1,13 +1,20 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from pymilvus import Collection, utility
 from dataset.food import *
 from dataset.festival import * 
 from dataset.clova import *
 from dataset.performance import *
 from dataset.movie import *
+from dataset.search import *
+from dataset.course import *
+from dataset.singleflight import *
+from dataset.metrics import *
+from dataset.eventdate import course_date
+from dataset.district import course_district
 from dotenv import load_dotenv
 from apscheduler.schedulers.background import BackgroundScheduler
 import os
+import time
 
 load_dotenv()
 
@@ -16,16 +23,6 @@ app = Flask(__name__)
 sched = BackgroundScheduler(daemon=True)
 
 
-# Milvus 연결
-def connect_to_milvus():
-    try:
-        connections.connect(alias=os.environ.get('MILVUS_ALIAS'),
-                            host=os.environ.get('MILVUS_HOST'),
-                            port=int(os.environ.get("MILVUS_PORT")))
-        print("Milvus에 성공적으로 연결되었습니다.")
-    except Exception as e:
-        print(f"Milvus 연결 오류: {e}")
-
 # festival data (cycle: every day)
 @sched.scheduled_job('cron', hour='0', minute='30',id='festival')
 @app.route('/festival', methods=['GET'])
@@ -58,9 +55,6 @@ def get_performance():
 
 
 def recommendByDB():
-    # milvus 연결
-    connect_to_milvus()
-
     # 요청 데이터 읽기
     data = request.get_json()
     keyword_list = data.get('keyword')
@@ -71,142 +65,135 @@ def recommendByDB():
         keyword = keyword_list  
     
     # Query 벡터 생성
-    query_vector = query_embed(keyword)
-
-    search_params = {"metric_type": "IP", "params": {"ef": 64}}
-    collections = ["festival_hereforus", "performance_hereforus", "food_hereforus"]
-    aggregated_results = []
- 
-    # 컬렉션에서 검색
-    for collection_name in collections:
-        if utility.has_collection(collection_name):
-            collection = Collection(collection_name)
-            collection.load()
-            
-            results = collection.search(
-                data=[query_vector],
-                anns_field="embedding",
-                param=search_params,
-                limit=1,  
-                output_fields=["id", "text"]
-            )
-
-            aggregated_results.extend([
-                {
-                    "collection": collection_name,  # 컬렉션 이름 추가
-                    "id": hit.entity.get("id"),
-                    "distance": hit.distance,
-                    "text": hit.entity.get("text")
-                }
-                for hit in results[0]
-            ])
+    with time_request_stage(request.path, "query_embed"):
+        query_vector = query_embed(keyword)
+
+    # 컬렉션별 병렬 검색 또는 통합 places 컬렉션 1회 검색 (ef 는 index_config.json 의 컬렉션별 값)
+    # 행사는 기준 일자(요청의 date, 기본값 오늘)에 진행 중인 것만, 음식점은 지역(keyword[0])의 자치구만 검색
+    with time_request_stage(request.path, "search"):
+        aggregated_results = search_all(
+            query_vector, date=course_date(data.get('date')), district=course_district(keyword_list)
+        )
 
     # JSON 직렬화가 가능한 데이터 반환
     print(aggregated_results)
     return aggregated_results
 
-@app.route('/course', methods=['POST'])
-def recommendByClova():
+# 캐시 상태 조회
+@app.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({
+        "query_embedding": get_query_embedding_cache().stats(),
+        "response": get_response_cache().stats(),
+        "singleflight": get_course_flight().stats()
+    }), 200
+
+# Prometheus 지표
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
+# 응답 캐시 키 (정규화된 키워드 + 인덱서가 올리는 데이터 버전 + 기준 일자)
+def course_cache_key():
+    data = request.get_json()
+    return normalize_keywords(data.get('keyword')), get_data_stamp(), course_date(data.get('date'))
+
+# 검색 → LLM 응답 생성 후 캐시에 저장
+def course_response(cache_key):
     data = recommendByDB()
 
     # 컬렉션별로 데이터 분리
-    festival_results = [item for item in data if item["collection"] == "festival_hereforus"]
-    performance_results = [item for item in data if item["collection"] == "performance_hereforus"]
-    food_results = [item for item in data if item["collection"] == "food_hereforus"]
-
-    print(performance_results)
-
-    # 축제와 공연 각각의 id 리스트 생성
-    festival_ids = [item["id"] for item in festival_results]
-    performance_ids = [item["id"] for item in performance_results]
-    food_ids = [item["id"] for item in food_results]
-
-    # 축제와 공연 각각의 text 리스트 생성
-    festival_texts = [item["text"] for item in festival_results]
-    performance_texts = [item["text"] for item in performance_results]
-    food_texts = [item["text"] for item in food_results]
+    results = split_results(data)
 
     # 요청 데이터 읽기
     bodyResponse = request.get_json()
     keyword_list = bodyResponse.get('keyword')
     
-    completion_executor = CompletionExecutor(
-        host=os.environ.get('CLOVASTUDIO_MODEL_HOST'),
-        api_key=os.environ.get('CLOVASTUDIO_MODEL_API_KEY'),
-        api_key_primary_val=os.environ.get('CLOVASTUDIO_MODEL_APIGW_API_KEY'),
-        request_id=os.environ.get('CLOVASTUDIO_MODEL_REQUEST_ID'),
-    )
+    completion_executor = get_completion_executor()
+    request_data = build_course_request(keyword_list, results)
 
-    preset_text = [
-    {
-        "role": "system",
-        "content": (
-            f"- {keyword_list[0]}에 있는 {keyword_list[3]} 시간대부터 {keyword_list[1]}에서 놀 만한 {keyword_list[2]} 분위기의 {keyword_list[5]}이 있는 장소들과 {keyword_list[4]} 종류의 음식점 한 곳을 포함한 데이트 코스를 추천해줘.\n\n"
-            "-  장소를 **시간대별로** 1시간 간격으로 추천해줘. 동선이 효율적이도록 고려해서 장소 간 이동이 효율적이도록 합니다. \n"
-            "- 각 장소의 방문 이유와 예상 활동을 간단히 설명해주세요.\n"
-            "- 시간대에 맞는 장소를 추천합니다. 특히 음식점은 한 번 정도만 추천하는 것이 적당합니다."
-            "- 음식점과 공연, 축제에 대한 정보는 반드시 reference에 포함된 음식점 정보를 반드시 활용하여 추천합니다.\n"
-            "- 행사의 일정이나 기간은 나오지 않도록 합니다."
-            "- 답변 형식:\n"
-            "  - 반드시 친근한 반말로 답변해야 합니다.\n"
-        )
-    }
-    ]
-
-    preset_text.append(
-        {
-            "role": "assistant",
-            "content": f"reference: {festival_texts}"
-        }
-    )
+    with time_request_stage(request.path, "llm"):
+        response_data = completion_executor.execute(request_data)  # LLM 응답
+    print(response_data)
 
-    preset_text.append(
-        {
-            "role": "assistant",
-            "content": f"reference: {performance_texts}"
-        }
-    )
+    # JSON 응답 구성
+    response_body = {
+        "llm_response": response_data,  # LLM의 추천 결과
+        **results  # 축제 / 공연 / 음식점 데이터
+    }
+    get_response_cache().put(cache_key, response_body)
+    return response_body
 
-    
-    preset_text.append(
-        {
-            "role": "assistant",
-            "content": f"reference: {food_texts}"
-        }
-    )
+@app.route('/course', methods=['POST'])
+@REQUEST_STAGE_SECONDS.labels("/course", "total").time()
+def recommendByClova():
+    # 같은 키워드 + 같은 데이터 버전이면 캐시된 응답 반환
+    cache_key = course_cache_key()
+    cached = get_response_cache().get(cache_key)
+    if cached is not None:
+        return jsonify(cached), 200
 
-    print(preset_text)
-
-    request_data = {
-        'messages': preset_text,
-        'topP': 0.2,
-        'topK': 0,
-        'maxTokens': 1024,
-        'temperature': 0.7,
-        'repeatPenalty': 5.0,
-        'stopBefore': [],
-        'includeAiFilters': True,
-        'seed': 0
-    }
- 
-       # LLM 응답 생성
+    # 같은 키의 요청이 처리 중이면 새로 생성하지 않고 그 결과를 함께 사용
     try:
-        response_data = completion_executor.execute(request_data)  # LLM 응답
-        print(response_data)
-
-        # JSON 응답 구성
-        return jsonify({
-            "llm_response": response_data,  # LLM의 추천 결과
-            "festival_results": festival_results,  # 축제 데이터
-            "performance_results": performance_results,  # 공연 데이터
-            "food_results": food_results
-        }), 200
+        response_body = get_course_flight().do(cache_key, lambda: course_response(cache_key))
+        return jsonify(response_body), 200
     except Exception as e:
         print(f"Error during LLM response: {e}")
         return jsonify({"error": f"LLM 응답 중 오류 발생: {str(e)}"}), 500
+
+# 검색 결과를 먼저 보내고 LLM 토큰을 생성되는 대로 SSE로 전달
+@app.route('/course/stream', methods=['POST'])
+def recommendByClovaStream():
+    # 캐시된 응답은 검색 결과 + 전체 텍스트 1건으로 바로 전송
+    cache_key = course_cache_key()
+    cached = get_response_cache().get(cache_key)
+    if cached is not None:
+        cached_results = {key: value for key, value in cached.items() if key != "llm_response"}
+        return Response(
+            format_sse("retrieval", cached_results)
+            + format_sse("token", {"content": cached["llm_response"]})
+            + format_sse("done", {}),
+            mimetype="text/event-stream"
+        )
+
+    data = recommendByDB()
+    results = split_results(data)
+
+    bodyResponse = request.get_json()
+    keyword_list = bodyResponse.get('keyword')
+
+    completion_executor = get_completion_executor()
+    request_data = build_course_request(keyword_list, results)
+
+    endpoint = request.path
+
+    def generate():
+        yield format_sse("retrieval", results)
+        try:
+            tokens = []
+            started = time.perf_counter()
+            for token in completion_executor.stream(request_data):
+                if not tokens:
+                    observe_request_stage(endpoint, "llm_first_token", time.perf_counter() - started)
+                tokens.append(token)
+                yield format_sse("token", {"content": token})
+            observe_request_stage(endpoint, "llm", time.perf_counter() - started)
+            get_response_cache().put(cache_key, {"llm_response": "".join(tokens), **results})
+            yield format_sse("done", {})
+        except Exception as e:
+            print(f"Error during LLM response: {e}")
+            yield format_sse("error", {"error": f"LLM 응답 중 오류 발생: {str(e)}"})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
     
 
 if __name__ == '__main__':
     sched.start()
+    collection_registry.warm()
 
     app.run(debug=True, host='0.0.0.0', port=int(os.environ.get('PORT')))
\ No newline at end of file
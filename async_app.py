@@ -0,0 +1,168 @@
+from aiohttp import web
+from dataset.aio import *
+from dataset.cache import get_query_embedding_cache, get_response_cache, normalize_keywords
+from dataset.course import *
+from dataset.eventdate import course_date
+from dataset.district import course_district
+from dataset.registry import collection_registry, get_data_stamp
+from dataset.metrics import *
+from dataset.singleflight import AsyncSingleFlight
+from dotenv import load_dotenv
+import os
+import time
+
+load_dotenv()
+
+# /course 비동기 서버 (임베딩 → 검색 → LLM 전 구간 asyncio)
+# 요청마다 스레드를 점유하지 않으므로 한 프로세스에서 수백 건을 동시에 처리
+# 데이터 수집 / 인덱싱 스케줄러는 기존 Flask 서버(app.py)에서 실행
+routes = web.RouteTableDef()
+
+# 같은 키워드의 동시 /course 요청 합치기
+course_flight = AsyncSingleFlight()
+
+
+# date: 추천 기준 일자 (YYYYMMDD, 행사는 이 날 진행 중인 것만 검색)
+async def recommendByDB(keyword_list, endpoint, date=None):
+    if isinstance(keyword_list, list):
+        keyword = ", ".join(keyword_list)
+    else:
+        keyword = keyword_list
+
+    # Query 벡터 생성
+    with time_request_stage(endpoint, "query_embed"):
+        query_vector = await async_query_embed(keyword)
+
+    # 컬렉션별 병렬 검색 또는 통합 places 컬렉션 1회 검색 (ef 는 index_config.json 의 컬렉션별 값)
+    # 음식점은 지역(keyword[0])의 자치구 partition 만 검색
+    with time_request_stage(endpoint, "search"):
+        aggregated_results = await async_search_all(query_vector, date=date, district=course_district(keyword_list))
+
+    print(aggregated_results)
+    return aggregated_results
+
+
+# 캐시 상태 조회
+@routes.get('/cache/stats')
+async def get_cache_stats(request):
+    return web.json_response({
+        "query_embedding": get_query_embedding_cache().stats(),
+        "response": get_response_cache().stats(),
+        "singleflight": course_flight.stats()
+    })
+
+
+# 검색 → LLM 응답 생성 후 캐시에 저장
+async def course_response(keyword_list, date, cache_key):
+    data = await recommendByDB(keyword_list, "/course", date)
+    results = split_results(data)
+    request_data = build_course_request(keyword_list, results)
+
+    with time_request_stage("/course", "llm"):
+        response_data = await async_complete(request_data)
+    print(response_data)
+
+    response_body = {
+        "llm_response": response_data,
+        **results
+    }
+    get_response_cache().put(cache_key, response_body)
+    return response_body
+
+
+# Prometheus 지표
+@routes.get('/metrics')
+async def get_metrics(request):
+    body, content_type = render_metrics()
+    return web.Response(body=body, headers={"Content-Type": content_type})
+
+
+@routes.post('/course')
+async def recommendByClova(request):
+    with time_request_stage("/course", "total"):
+        body = await request.json()
+        keyword_list = body.get('keyword')
+        date = course_date(body.get('date'))
+
+        # 같은 키워드 + 같은 데이터 버전 + 같은 기준 일자면 캐시된 응답 반환
+        cache_key = (normalize_keywords(keyword_list), get_data_stamp(), date)
+        cached = get_response_cache().get(cache_key)
+        if cached is not None:
+            return web.json_response(cached)
+
+        # 같은 키의 요청이 처리 중이면 새로 생성하지 않고 그 결과를 함께 사용
+        try:
+            response_body = await course_flight.do(cache_key, lambda: course_response(keyword_list, date, cache_key))
+            return web.json_response(response_body)
+        except Exception as e:
+            print(f"Error during LLM response: {e}")
+            return web.json_response({"error": f"LLM 응답 중 오류 발생: {str(e)}"}, status=500)
+
+
+# 검색 결과를 먼저 보내고 LLM 토큰을 생성되는 대로 SSE로 전달
+@routes.post('/course/stream')
+async def recommendByClovaStream(request):
+    body = await request.json()
+    keyword_list = body.get('keyword')
+    date = course_date(body.get('date'))
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+    cache_key = (normalize_keywords(keyword_list), get_data_stamp(), date)
+    cached = get_response_cache().get(cache_key)
+    if cached is not None:
+        cached_results = {key: value for key, value in cached.items() if key != "llm_response"}
+        await response.prepare(request)
+        await response.write((
+            format_sse("retrieval", cached_results)
+            + format_sse("token", {"content": cached["llm_response"]})
+            + format_sse("done", {})
+        ).encode("utf-8"))
+        await response.write_eof()
+        return response
+
+    data = await recommendByDB(keyword_list, "/course/stream", date)
+    results = split_results(data)
+    request_data = build_course_request(keyword_list, results)
+
+    await response.prepare(request)
+    await response.write(format_sse("retrieval", results).encode("utf-8"))
+    try:
+        tokens = []
+        started = time.perf_counter()
+        async for token in async_stream_completion(request_data):
+            if not tokens:
+                observe_request_stage("/course/stream", "llm_first_token", time.perf_counter() - started)
+            tokens.append(token)
+            await response.write(format_sse("token", {"content": token}).encode("utf-8"))
+        observe_request_stage("/course/stream", "llm", time.perf_counter() - started)
+        get_response_cache().put(cache_key, {"llm_response": "".join(tokens), **results})
+        await response.write(format_sse("done", {}).encode("utf-8"))
+    except ConnectionResetError:
+        # 클라이언트 연결 종료
+        raise
+    except Exception as e:
+        print(f"Error during LLM response: {e}")
+        await response.write(format_sse("error", {"error": f"LLM 응답 중 오류 발생: {str(e)}"}).encode("utf-8"))
+    await response.write_eof()
+    return response
+
+
+async def close_sessions(app):
+    await close_aio_session()
+
+
+def create_app():
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_cleanup.append(close_sessions)
+    return app
+
+
+if __name__ == '__main__':
+    collection_registry.warm()
+
+    web.run_app(create_app(), host='0.0.0.0', port=int(os.environ.get('ASYNC_PORT', os.environ.get('PORT'))))
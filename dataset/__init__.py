@@ -3,3 +3,29 @@ from .festival import *
 from .performance import *
 from .movie import *
 from .clova import *
+from .cache import *
+from .delta import *
+from .versioning import *
+from .ratelimit import *
+from .embedding import *
+from .pipeline import *
+from .buffer import *
+from .session import *
+from .registry import *
+from .search import *
+from .places import *
+from .course import *
+from .snapshot import *
+from .quantization import *
+from .aio import *
+from .singleflight import *
+from .metrics import *
+from .checkpoint import *
+from .retryqueue import *
+from .bulkload import *
+from .indexing import *
+from .indexconfig import *
+from .tuning import *
+from .eventdate import *
+from .district import *
+from .columns import *
@@ -0,0 +1,314 @@
+import asyncio
+import json
+import os
+import aiohttp
+from dataset.cache import get_query_embedding_cache, normalize_query
+from dataset.clova import get_completion_executor, get_embedding_executor
+from dataset.indexconfig import get_search_params
+from dataset.places import PLACES_COLLECTION, is_places_layout
+from dataset.ratelimit import RateLimitError
+from dataset.registry import SEARCH_COLLECTIONS, collection_registry
+from dataset.search import (_collection_hit, _district_filter, _district_retry_categories, _filter_expr,
+                            _places_filter_expr, _places_hit, _search_executor, get_search_engine, search_snapshot,
+                            search_snapshots)
+from dataset.session import get_http_timeout
+from dataset.snapshot import get_snapshot
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 이벤트 루프별 aiohttp 세션
+_aio_sessions = {}
+
+
+# 이벤트 루프에서 공유하는 keep-alive aiohttp 세션
+# 요청마다 스레드를 쓰지 않으므로 동시 요청 수는 커넥션 수(AIO_HTTP_POOL_SIZE)로만 제한
+def get_aio_session():
+    loop = asyncio.get_running_loop()
+    session = _aio_sessions.get(loop)
+    if session is None or session.closed:
+        connect_timeout, read_timeout = get_http_timeout()
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=int(os.environ.get('AIO_HTTP_POOL_SIZE', 100))),
+            timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        )
+        _aio_sessions[loop] = session
+    return session
+
+
+async def close_aio_session():
+    session = _aio_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+# 검색어 임베딩 (query_embed 의 비동기 버전, 같은 LRU 캐시 사용)
+async def async_query_embed(text: str):
+    query = normalize_query(text)
+    cached = get_query_embedding_cache().get(query)
+    if cached is not None:
+        return cached
+
+    embedding_executor = get_embedding_executor()
+    async with get_aio_session().post(
+        embedding_executor.url(),
+        data=json.dumps({"text": query}),
+        headers=embedding_executor.headers()
+    ) as response:
+        if response.status == 429:
+            raise RateLimitError(response.headers.get('Retry-After'))
+        result = json.loads((await response.read()).decode(encoding='utf-8'))
+
+    response_data = embedding_executor.parse(result)
+    get_query_embedding_cache().put(query, response_data)
+
+    return response_data
+
+
+# ClovaX 스트림의 (event, data) 라인 순회
+async def _iter_completion_events(request_data):
+    completion_executor = get_completion_executor()
+    async with get_aio_session().post(
+        completion_executor.url(),
+        data=json.dumps(request_data),
+        headers=completion_executor.headers()
+    ) as response:
+        response.raise_for_status()
+        event = None
+        async for line in response.content:
+            decoded_line = line.decode("utf-8").strip()
+            if not decoded_line:
+                continue
+            if '"data":"[DONE]"' in decoded_line:
+                break
+            if decoded_line.startswith("event:"):
+                event = decoded_line[6:].strip()
+            elif decoded_line.startswith("data:"):
+                yield event, json.loads(decoded_line[5:])
+
+
+# CompletionExecutor.execute 의 비동기 버전 (마지막 'data:' 의 content 반환)
+async def async_complete(request_data):
+    last_data_content = ""
+    async for event, data in _iter_completion_events(request_data):
+        last_data_content = data["message"]["content"]
+    return last_data_content
+
+
+# CompletionExecutor.stream 의 비동기 버전 ('token' 이벤트 content 를 도착하는 대로 반환)
+async def async_stream_completion(request_data):
+    async for event, data in _iter_completion_events(request_data):
+        if event == "token":
+            yield data["message"]["content"]
+
+
+# collection.search(_async=True) → asyncio future (응답을 기다리는 스레드 없이 gRPC 완료 시 이벤트 루프로 전달)
+# pymilvus 의 _callback 은 SearchFuture.result() 안에서만 호출되므로 gRPC 응답이 도착한 뒤
+# gRPC 스레드에서 result() 를 호출하고, 결과(_callback) / 오류는 call_soon_threadsafe 로 전달
+def async_milvus_search(collection, **kwargs):
+    loop = asyncio.get_running_loop()
+    waiter = loop.create_future()
+
+    def deliver(callback, value):
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(callback, value)
+
+    def set_result(results):
+        if not waiter.done():
+            waiter.set_result(results)
+
+    def set_exception(error):
+        if not waiter.done():
+            waiter.set_exception(error)
+
+    search_future = collection.search(**kwargs, _async=True, _callback=lambda results: deliver(set_result, results))
+
+    def on_response(_=None):
+        try:
+            search_future.result()
+        except Exception as e:
+            deliver(set_exception, e)
+
+    # 요청 전에 실패한 경우에는 gRPC future 가 없음 (result() 가 바로 오류 반환)
+    response = getattr(getattr(search_future, "_f", None), "_future", None)
+    if response is None:
+        on_response()
+    else:
+        response.add_done_callback(on_response)
+
+    def cancel(future):
+        if future.cancelled():
+            search_future.cancel()
+
+    waiter.add_done_callback(cancel)
+    return waiter
+
+
+# NumPy 스냅샷 검색 (행렬 곱은 검색 스레드 풀에서 실행)
+async def async_search_snapshot(collection_name, query_vector, limit=1, date=None, district=None):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_search_executor, search_snapshot, collection_name, query_vector, limit,
+                                      date, district)
+
+
+async def async_search_snapshots(query_vector, collection_names=None, limit=1, date=None, district=None):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_search_executor, search_snapshots, query_vector, collection_names, limit,
+                                      date, district)
+
+
+# 캐시된 Collection 핸들 조회 (다시 로드해야 하면 connect / load 를 검색 스레드 풀에서 실행)
+async def async_get_collection(collection_name):
+    found, collection = collection_registry.lookup(collection_name)
+    if found:
+        return collection
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_search_executor, collection_registry.get, collection_name)
+
+
+# Milvus 컬렉션 비동기 검색 (컬렉션이 없으면 None)
+async def async_search_milvus_collection(collection_name, query_vector, search_params=None, limit=1,
+                                         timeout=None, date=None, district=None):
+    # 캐시된 핸들 조회 (인덱서가 새 버전을 알린 직후 1회만 로드)
+    collection = await async_get_collection(collection_name)
+    if collection is None:
+        return None
+
+    async def search(district):
+        results = await async_milvus_search(
+            collection,
+            data=[query_vector],
+            anns_field="embedding",
+            param=search_params or get_search_params(collection_name),
+            limit=limit,
+            expr=_filter_expr(collection_name, collection, date, district),
+            output_fields=["id", "text"],
+            timeout=timeout
+        )
+        return [_collection_hit(collection_name, hit) for hit in results[0]]
+
+    # 요청 자치구에 결과가 없으면 지역 조건 없이 다시 검색
+    results = await search(district)
+    if not results and _district_filter(collection_name, district) is not None:
+        results = await search(None)
+    return results
+
+
+# search_collection 의 비동기 버전 (엔진 선택 / 스냅샷 대체 규칙 동일)
+async def async_search_collection(collection_name, query_vector, search_params=None, limit=1, timeout=None,
+                                  date=None, district=None):
+    if get_search_engine() == "numpy":
+        results = await async_search_snapshot(collection_name, query_vector, limit, date, district)
+        if results is not None:
+            return results
+        return await async_search_milvus_collection(collection_name, query_vector, search_params, limit,
+                                                    timeout, date, district) or []
+
+    try:
+        results = await async_search_milvus_collection(collection_name, query_vector, search_params, limit,
+                                                       timeout, date, district)
+    except Exception as e:
+        results = await async_search_snapshot(collection_name, query_vector, limit, date, district)
+        if results is None:
+            raise
+        print(f"컬렉션 '{collection_name}' 검색 오류, 스냅샷으로 대체합니다: {e}")
+        return results
+
+    if results is None:
+        results = await async_search_snapshot(collection_name, query_vector, limit, date, district)
+    return results or []
+
+
+# search_collections 의 비동기 버전 (느리거나 실패한 컬렉션은 결과에서 제외)
+async def async_search_collections(query_vector, search_params=None, collection_names=None, limit=1,
+                                   timeout=None, date=None, district=None):
+    collection_names = collection_names or SEARCH_COLLECTIONS
+    timeout = timeout or float(os.environ.get('SEARCH_TIMEOUT', 2.0))
+
+    tasks = {
+        asyncio.ensure_future(async_search_collection(name, query_vector, search_params, limit, timeout,
+                                                      date, district)): name
+        for name in collection_names
+    }
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+    aggregated_results = []
+    for task, name in tasks.items():
+        if task in pending:
+            task.cancel()
+            print(f"컬렉션 '{name}' 검색 시간 초과 ({timeout}s)")
+        elif task.exception() is not None:
+            print(f"컬렉션 '{name}' 검색 오류: {task.exception()}")
+        else:
+            aggregated_results.extend(task.result())
+    return aggregated_results
+
+
+# search_places 의 비동기 버전
+async def async_search_places(query_vector, search_params=None, categories=None, limit=1, timeout=None,
+                              date=None, district=None):
+    categories = categories or SEARCH_COLLECTIONS
+    timeout = timeout or float(os.environ.get('SEARCH_TIMEOUT', 2.0))
+    collection = await async_get_collection(PLACES_COLLECTION)
+    if collection is None:
+        return []
+    search_params = search_params or get_search_params(PLACES_COLLECTION)
+
+    category_list = ", ".join(f'"{category}"' for category in categories)
+    filter_expr = _places_filter_expr(collection, date, district)
+
+    async def search_category(category, filter_expr=filter_expr):
+        results = await async_milvus_search(
+            collection,
+            data=[query_vector],
+            anns_field="embedding",
+            param=search_params,
+            limit=limit,
+            expr=f'category == "{category}"{filter_expr}',
+            output_fields=["category", "source_id", "text"],
+            timeout=timeout
+        )
+        return [_places_hit(hit) for hit in results[0]]
+
+    # 요청 자치구에 결과가 없는 카테고리는 지역 조건 없이 다시 검색
+    async def retry_without_district(results):
+        for category in _district_retry_categories(categories, results, district):
+            results.extend(await search_category(category, _places_filter_expr(collection, date)))
+        return results
+
+    if limit == 1:
+        search = async_milvus_search(
+            collection,
+            data=[query_vector],
+            anns_field="embedding",
+            param=search_params,
+            limit=len(categories),
+            expr=f"category in [{category_list}]{filter_expr}",
+            output_fields=["category", "source_id", "text"],
+            group_by_field="category",
+            timeout=timeout
+        )
+        results = await asyncio.wait_for(search, timeout)
+        return await asyncio.wait_for(retry_without_district([_places_hit(hit) for hit in results[0]]), timeout)
+
+    aggregated_results = []
+    for results in await asyncio.wait_for(asyncio.gather(*map(search_category, categories)), timeout):
+        aggregated_results.extend(results)
+    return await asyncio.wait_for(retry_without_district(aggregated_results), timeout)
+
+
+# search_all 의 비동기 버전
+async def async_search_all(query_vector, search_params=None, limit=1, timeout=None, date=None, district=None):
+    if is_places_layout():
+        if get_search_engine() == "numpy" and all(get_snapshot(name) for name in SEARCH_COLLECTIONS):
+            return await async_search_collections(query_vector, search_params, limit=limit, timeout=timeout,
+                                                  date=date, district=district)
+        try:
+            return await async_search_places(query_vector, search_params, limit=limit, timeout=timeout,
+                                             date=date, district=district)
+        except Exception as e:
+            # 통합 레이아웃에서는 카테고리별 컬렉션이 갱신되지 않으므로 스냅샷으로만 대체
+            print(f"컬렉션 '{PLACES_COLLECTION}' 검색 오류, 스냅샷으로 대체합니다: {e}")
+            return await async_search_snapshots(query_vector, limit=limit, date=date, district=district)
+    return await async_search_collections(query_vector, search_params, limit=limit, timeout=timeout,
+                                          date=date, district=district)
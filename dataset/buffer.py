@@ -0,0 +1,57 @@
+import queue
+import numpy as np
+
+EMBEDDING_DIM = 1024
+
+
+# 미리 할당한 float32 배열에 임베딩을 직접 기록하는 삽입 버퍼
+class EmbeddingBuffer:
+    def __init__(self, capacity, dim=EMBEDDING_DIM):
+        self.capacity = capacity
+        self.embeddings = np.empty((capacity, dim), dtype=np.float32)
+        self.ids = []
+        self.texts = []
+        self.columns = {}
+
+    @property
+    def size(self):
+        return len(self.ids)
+
+    def is_full(self):
+        return self.size >= self.capacity
+
+    # columns: 원본 항목의 scalar 필드 값 ({필드: 값}, 없으면 [ids, texts, embeddings] 만 사용)
+    def append(self, pk, text, embedding, columns=None):
+        self.embeddings[self.size] = embedding
+        self.ids.append(pk)
+        self.texts.append(text)
+        for field, value in (columns or {}).items():
+            self.columns.setdefault(field, []).append(value)
+
+    # Milvus insert/upsert 형식 (복사 없이 배열 view 전달, scalar 컬럼은 embeddings 뒤에 필드 순서대로)
+    def entities(self):
+        return [self.ids, self.texts, self.embeddings[:self.size], *self.columns.values()]
+
+    def clear(self):
+        self.ids = []
+        self.texts = []
+        self.columns = {}
+
+
+# 고정 개수의 버퍼를 재사용해 인덱서 메모리 사용량을 제한
+class BufferPool:
+    def __init__(self, count, capacity, dim=EMBEDDING_DIM):
+        self._free = queue.Queue()
+        for _ in range(count):
+            self._free.put(EmbeddingBuffer(capacity, dim))
+
+    # 사용 가능한 버퍼가 없으면 대기 (timeout 시 None)
+    def acquire(self, timeout=None):
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, buffer):
+        buffer.clear()
+        self._free.put(buffer)
@@ -0,0 +1,345 @@
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from pymilvus import BulkInsertState, utility
+from dataset.eventdate import EVENT_COLLECTIONS, create_event_date_indexes
+from dataset.versioning import activate_collection, create_shadow_collection
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STAGING_FORMATS = ("parquet", "numpy")
+
+
+def get_staging_dir():
+    return os.environ.get('STAGING_DIR', '.cache/staging')
+
+
+# 전체 재구축 시 행 단위 insert 대신 staging 파일 + Milvus bulk insert 사용 여부
+def is_bulk_load_enabled():
+    return os.environ.get('BULK_LOAD', 'false').lower() == 'true'
+
+
+# 임베딩 결과를 (id, text, embedding) 컬럼 파일로 기록
+# <STAGING_DIR>/<alias>/<version>/page-00000-0000.parquet (또는 page-00000-0000/{id,text,embedding}.npy)
+# pipeline sub-batch 마다 파트 파일을 .tmp 로 바로 쓰고 commit_page 에서 확정 (메모리 사용량은 batch_size 와 무관)
+# 체크포인트에서 이어서 실행해 같은 페이지를 다시 쓰면 지난 실행의 파트를 먼저 삭제
+# retry: 재시도 큐에서 다시 임베딩한 레코드 (finalize 시 페이지 파일과 겹치는 id 제거)
+# fields: entities 의 embeddings 뒤 scalar 컬럼 이름 (bulk insert 는 스키마의 모든 필드가 파일에 있어야 함)
+class StagingWriter:
+    def __init__(self, directory, staging_format=None, fields=()):
+        self.directory = directory
+        self.fields = tuple(fields)
+        self.format = staging_format or os.environ.get('STAGING_FORMAT', 'parquet')
+        if self.format not in STAGING_FORMATS:
+            raise ValueError(f"지원하지 않는 staging 형식: {self.format}")
+        os.makedirs(directory, exist_ok=True)
+        # 이번 실행에서 쓰는 중인 페이지별 .tmp 파트 경로
+        self._pages = {}
+        self._retry = self._empty_rows()
+
+        # 이어서 실행: 지난 실행에서 저장한 재시도 레코드 유지
+        retry_path = part_path(os.path.join(directory, "retry"), self.format)
+        if os.path.exists(retry_path):
+            ids, texts, embeddings, *extra = read_part(retry_path, self.format, self._columns())
+            self._retry = [ids, texts, [embeddings], *extra]
+
+    def _columns(self):
+        return ["id", "text", "embedding", *self.fields]
+
+    def _empty_rows(self):
+        return [[], [], [], *([] for _ in self.fields)]
+
+    # 재시도 레코드에 [ids, texts, embeddings, scalar 컬럼...] 추가 (버퍼는 재사용되므로 복사)
+    def _append(self, rows, entities):
+        rows[0].extend(entities[0])
+        rows[1].extend(entities[1])
+        rows[2].append(np.array(entities[2], dtype=np.float32))
+        for values, column in zip(rows[3:], entities[3:]):
+            values.extend(column)
+
+    # pipeline insert 단계 (sub-batch 를 바로 .tmp 파트로 기록, 버퍼는 재사용되므로 메모리에 남기지 않음)
+    def add(self, page, entities):
+        parts = self._start_page(page)
+        if not len(entities[0]):
+            return
+        base = os.path.join(self.directory, f"page-{page:05d}-{len(parts):04d}")
+        write_part(base, self.format, entities[0], entities[1], np.asarray(entities[2], dtype=np.float32),
+                   dict(zip(self.fields, entities[3:])), commit=False)
+        parts.append(part_path(base, self.format))
+
+    # 페이지의 첫 sub-batch: 지난 실행에서 남은 같은 페이지 파트(확정 / .tmp) 삭제
+    def _start_page(self, page):
+        if page not in self._pages:
+            prefixes = (f"page-{page:05d}.", f"page-{page:05d}-")
+            for name in os.listdir(self.directory):
+                if name.startswith(prefixes):
+                    remove_path(os.path.join(self.directory, name))
+            self._pages[page] = []
+        return self._pages[page]
+
+    # 재시도 큐 drain 대상 (collection.upsert 와 같은 형식)
+    def upsert(self, entities):
+        self._append(self._retry, entities)
+        self._write("retry", self._retry)
+
+    # 페이지의 모든 sub-batch 가 끝난 뒤 .tmp 파트를 확정 (확정 전에 중단되면 파트는 bulk insert 대상이 아님)
+    def commit_page(self, page):
+        self._start_page(page)
+        for path in self._pages.pop(page):
+            replace_part(f"{path}.tmp", path)
+
+    def _write(self, name, rows):
+        ids, texts, chunks, *extra = rows
+        embeddings = np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+        write_part(os.path.join(self.directory, name), self.format, ids, texts, embeddings,
+                   dict(zip(self.fields, extra)))
+
+    # 재시도 레코드 중 페이지 파일에 이미 있는 id 제거 (bulk insert 는 pk 중복을 막지 않음)
+    def finalize(self):
+        retry_path = part_path(os.path.join(self.directory, "retry"), self.format)
+        if not os.path.exists(retry_path):
+            return
+        page_ids = set()
+        for path in list_parts(self.directory):
+            if path != retry_path:
+                page_ids.update(read_part(path, self.format, columns=["id"])[0])
+        ids, texts, embeddings, *extra = read_part(retry_path, self.format, self._columns())
+        keep = [index for index, pk in enumerate(ids) if pk not in page_ids]
+        write_part(os.path.join(self.directory, "retry"), self.format,
+                   [ids[index] for index in keep], [texts[index] for index in keep], embeddings[keep],
+                   {field: [values[index] for index in keep] for field, values in zip(self.fields, extra)})
+
+    def write_meta(self, alias, collection_name):
+        meta = {"alias": alias, "collection": collection_name, "format": self.format,
+                "columns": list(self.fields), "created_at": time.time()}
+        with open(os.path.join(self.directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+
+def part_path(base, staging_format):
+    return f"{base}.parquet" if staging_format == "parquet" else base
+
+
+def remove_path(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+# 빈 파트는 bulk insert 할 수 없으므로 남기지 않음
+# commit=False: <파트>.tmp 까지만 쓰고 확정(os.replace)은 호출한 쪽에서 진행
+def write_part(base, staging_format, ids, texts, embeddings, extra=None, commit=True):
+    extra = extra or {}
+    path = part_path(base, staging_format)
+    if not len(ids):
+        remove_path(path)
+        return
+    temp_path = f"{path}.tmp"
+    remove_path(temp_path)
+    if staging_format == "parquet":
+        frame = pd.DataFrame({"id": ids, "text": texts, "embedding": list(embeddings)})
+        for column, values in extra.items():
+            frame[column] = values
+        frame.to_parquet(temp_path, index=False)
+    else:
+        os.makedirs(temp_path, exist_ok=True)
+        np.save(os.path.join(temp_path, "id.npy"), np.asarray(ids))
+        np.save(os.path.join(temp_path, "text.npy"), np.asarray(texts, dtype=str))
+        np.save(os.path.join(temp_path, "embedding.npy"), embeddings)
+        for column, values in extra.items():
+            np.save(os.path.join(temp_path, f"{column}.npy"), np.asarray(values))
+    if commit:
+        replace_part(temp_path, path)
+
+
+# 디렉터리 파트(numpy)는 os.replace 로 덮어쓸 수 없으므로 기존 파트를 먼저 삭제
+def replace_part(temp_path, path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.replace(temp_path, path)
+
+
+# embedding 은 float32 배열, 나머지 컬럼(id, text, scalar 필드)은 list
+def read_part(path, staging_format, columns=None):
+    columns = columns or ["id", "text", "embedding"]
+    if staging_format == "parquet":
+        frame = pd.read_parquet(path, columns=columns)
+
+        def read(column):
+            if column != "embedding":
+                return frame[column].tolist()
+            return np.stack(frame[column].to_numpy()).astype(np.float32) \
+                if len(frame) else np.zeros((0, 0), dtype=np.float32)
+    else:
+        def read(column):
+            values = np.load(os.path.join(path, f"{column}.npy"))
+            return values if column == "embedding" else values.tolist()
+    return [read(column) for column in columns]
+
+
+# 페이지 파일 + retry 파일 (이름순)
+def list_parts(directory):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if (name.startswith("page-") or name.startswith("retry")) and not name.endswith(".tmp")
+    )
+
+
+def read_meta(directory):
+    with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 전체 재구축의 staging 파일 (버전 컬렉션 이름별 디렉터리, 사용하지 않으면 None)
+# 이어서 실행할 때는 BULK_LOAD 설정과 관계없이 지난 실행과 같은 방식으로 적재
+def open_staging(checkpoint, fields=()):
+    if checkpoint is None:
+        return None
+    directory = os.path.join(get_staging_dir(), checkpoint.job, checkpoint.collection_name)
+    if checkpoint.resumed:
+        return StagingWriter(directory, fields=fields) if os.path.isdir(directory) else None
+    return StagingWriter(directory, fields=fields) if is_bulk_load_enabled() else None
+
+
+# 가장 최근 staging 디렉터리 (replay 용)
+def latest_staging(alias):
+    root = os.path.join(get_staging_dir(), alias)
+    if not os.path.isdir(root):
+        return None
+    versions = sorted(name for name in os.listdir(root) if os.path.exists(os.path.join(root, name, "meta.json")))
+    return os.path.join(root, versions[-1]) if versions else None
+
+
+# 최근 STAGING_KEEP 개만 남기고 삭제
+def drop_old_staging(alias, keep=None):
+    keep = int(os.environ.get('STAGING_KEEP', 1)) if keep is None else keep
+    root = os.path.join(get_staging_dir(), alias)
+    if not os.path.isdir(root):
+        return
+    versions = sorted(os.listdir(root))
+    for name in versions[:-keep] if keep > 0 else versions:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def get_minio_client():
+    from minio import Minio
+
+    return Minio(
+        os.environ.get('MINIO_ENDPOINT', f"{os.environ.get('MILVUS_HOST', 'localhost')}:9000"),
+        access_key=os.environ.get('MINIO_ACCESS_KEY', 'minioadmin'),
+        secret_key=os.environ.get('MINIO_SECRET_KEY', 'minioadmin'),
+        secure=os.environ.get('MINIO_SECURE', 'false').lower() == 'true'
+    )
+
+
+# staging 파일을 Milvus 가 사용하는 object storage(MinIO) 에 업로드
+# 반환값: bulk insert 작업별 파일 목록 (parquet: 파일 1개, numpy: 필드별 .npy)
+def upload_staging(directory, staging_format, remote_prefix, columns=()):
+    client = get_minio_client()
+    bucket = os.environ.get('MINIO_BUCKET', 'a-bucket')
+    tasks = []
+    for path in list_parts(directory):
+        name = os.path.basename(path)
+        if staging_format == "parquet":
+            files = [(path, f"{remote_prefix}/{name}")]
+        else:
+            files = [(os.path.join(path, f"{field}.npy"), f"{remote_prefix}/{name}/{field}.npy")
+                     for field in ("id", "text", "embedding", *columns)]
+        for local_path, remote_path in files:
+            client.fput_object(bucket, remote_path, local_path)
+        tasks.append([remote_path for _, remote_path in files])
+    print(f"staging 파일 {len(tasks)}개를 '{bucket}/{remote_prefix}'에 업로드했습니다.")
+    return tasks
+
+
+# staging 파일을 bulk insert 로 컬렉션에 적재하고 모든 작업이 끝날 때까지 대기
+def bulk_load(collection, directory, timeout=None):
+    meta = read_meta(directory)
+    timeout = timeout or float(os.environ.get('BULK_INSERT_TIMEOUT', 3600))
+    remote_prefix = f"{os.environ.get('STAGING_REMOTE_PREFIX', 'bulk')}/{os.path.relpath(directory, get_staging_dir())}"
+
+    task_ids = [
+        utility.do_bulk_insert(collection_name=collection.name, files=files)
+        for files in upload_staging(directory, meta["format"], remote_prefix, meta.get("columns", ()))
+    ]
+
+    started = time.time()
+    pending = set(task_ids)
+    row_count = 0
+    while pending:
+        if time.time() - started > timeout:
+            raise TimeoutError(f"bulk insert 시간 초과: 남은 작업 {sorted(pending)}")
+        time.sleep(2)
+        for task_id in list(pending):
+            state = utility.get_bulk_insert_state(task_id)
+            if state.state in (BulkInsertState.ImportFailed, BulkInsertState.ImportFailedAndCleaned):
+                raise RuntimeError(f"bulk insert 작업 {task_id} 실패: {state.failed_reason}")
+            if state.state == BulkInsertState.ImportCompleted:
+                pending.discard(task_id)
+                row_count += state.row_count
+
+    print(f"bulk insert 완료: {len(task_ids)}개 작업, {row_count}건, {time.time() - started:.1f}s")
+    return row_count
+
+
+# staging 파일을 행 단위 insert 로 적재 (object storage 를 쓸 수 없는 환경의 replay 용)
+# scalar 컬럼은 meta.json 의 columns 순서대로 파일에서 읽음
+def insert_staging(collection, directory, batch_size=None):
+    meta = read_meta(directory)
+    columns = ["id", "text", "embedding", *meta.get("columns", ())]
+    batch_size = batch_size or int(os.environ.get('MILVUS_INSERT_BATCH_SIZE', 256))
+    row_count = 0
+    for path in list_parts(directory):
+        values = read_part(path, meta["format"], columns)
+        for start in range(0, len(values[0]), batch_size):
+            collection.insert([column[start:start + batch_size] for column in values])
+        row_count += len(values[0])
+    print(f"staging 파일 insert 완료: {row_count}건")
+    return row_count
+
+
+# 전체 재구축 마지막 단계: staging 파일을 shadow 컬렉션에 bulk insert
+# bulk insert 가 실패하면 일부 작업만 반영됐을 수 있으므로 새 shadow 컬렉션에 행 단위로 삽입
+# 반환값: 인덱스를 만들고 활성화할 컬렉션
+def load_staging(alias, collection, staging, fields, num_partitions=None):
+    staging.finalize()
+    staging.write_meta(alias, collection.name)
+    try:
+        bulk_load(collection, staging.directory)
+        return collection
+    except Exception as e:
+        print(f"bulk insert 오류, staging 파일을 행 단위로 다시 삽입합니다: {e}")
+
+    try:
+        utility.drop_collection(collection.name)
+    except Exception as e:
+        print(f"컬렉션 '{collection.name}' 삭제 오류: {e}")
+    collection = create_shadow_collection(alias, fields, num_partitions)
+    insert_staging(collection, staging.directory)
+    return collection
+
+
+# 저장된 staging 파일로 재임베딩 없이 새 버전 컬렉션을 만들어 alias 전환
+# method: bulk (object storage 경유 bulk insert) / insert (행 단위 insert)
+def replay_staging(alias, fields, index_params, directory=None, method="bulk", num_partitions=None):
+    directory = directory or latest_staging(alias)
+    if directory is None:
+        raise FileNotFoundError(f"'{alias}'의 staging 파일이 없습니다.")
+
+    collection = create_shadow_collection(alias, fields, num_partitions)
+    if method == "bulk":
+        bulk_load(collection, directory)
+    else:
+        insert_staging(collection, directory)
+
+    collection.create_index(field_name="embedding", index_params=index_params)
+    if alias in EVENT_COLLECTIONS:
+        create_event_date_indexes(collection)
+    collection.load()
+    activate_collection(alias, collection)
+    return collection
@@ -0,0 +1,249 @@
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataset.quantization import decode_vector, encode_vector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# 임베딩 디스크 캐시 (텍스트 + 모델 기준 해시)
+# 저장 인코딩: float32 / float16 / int8 (항목마다 기록하므로 중간에 바꿔도 기존 항목은 그대로 읽힘)
+class EmbeddingCache:
+    def __init__(self, path, max_entries=200000, encoding="float32", touch_batch_size=1000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._max_entries = max_entries
+        self._encoding = encoding
+        self._lock = threading.Lock()
+        # hit 마다 commit 하지 않도록 last_used 갱신은 모아서 반영 (put / N건마다 / close)
+        self._touch_batch_size = touch_batch_size
+        self._touched = {}
+        self._closed = False
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, embedding BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")]
+        if "encoding" not in columns:
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN encoding TEXT NOT NULL DEFAULT 'float32'")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.api_calls = 0
+        self.api_seconds = 0.0
+
+    @staticmethod
+    def make_key(model_id, text):
+        return hashlib.sha256(f"{model_id}\n{text}".encode("utf-8")).hexdigest()
+
+    def get(self, model_id, text):
+        key = self.make_key(model_id, text)
+        with self._lock:
+            row = self._conn.execute("SELECT embedding, encoding FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= self._touch_batch_size:
+                self._flush_touched()
+                self._conn.commit()
+            self.hits += 1
+
+        return decode_vector(row[0], row[1])
+
+    def put(self, model_id, text, embedding, elapsed=0.0):
+        key = self.make_key(model_id, text)
+        blob = encode_vector(embedding, self._encoding)
+        with self._lock:
+            self._flush_touched()
+            exists = self._conn.execute("SELECT 1 FROM embeddings WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, embedding, last_used, encoding) VALUES (?, ?, ?, ?)",
+                (key, blob, time.time(), self._encoding)
+            )
+            if exists is None:
+                self._size += 1
+            self.api_calls += 1
+            self.api_seconds += elapsed
+            if self._size > self._max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def flush(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_touched()
+            self._conn.commit()
+
+    def _evict(self):
+        # 한도를 넘으면 오래 사용하지 않은 항목부터 10% 여유를 두고 삭제
+        target = int(self._max_entries * 0.9)
+        count = self._size - target
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (count,)
+        )
+        self._size -= count
+        self.evictions += count
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        avg_api_seconds = self.api_seconds / self.api_calls if self.api_calls else 0.0
+        return {
+            "entries": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": self.hits * avg_api_seconds
+        }
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+            self._closed = True
+
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache(
+                path=os.environ.get('EMBEDDING_CACHE_PATH', '.cache/embedding_cache.sqlite3'),
+                max_entries=int(os.environ.get('EMBEDDING_CACHE_MAX_ENTRIES', 200000)),
+                encoding=os.environ.get('EMBEDDING_CACHE_ENCODING', 'float32'),
+                touch_batch_size=int(os.environ.get('EMBEDDING_CACHE_TOUCH_BATCH', 1000))
+            )
+            # 종료 시 남은 last_used 갱신 반영
+            atexit.register(_embedding_cache.flush)
+        return _embedding_cache
+
+
+def print_cache_stats(cache=None):
+    stats = (cache or get_embedding_cache()).stats()
+    print(
+        f"임베딩 캐시: hits={stats['hits']}, misses={stats['misses']}, "
+        f"hit_rate={stats['hit_rate']:.1%}, evictions={stats['evictions']}, "
+        f"entries={stats['entries']}, 절약된 API 시간≈{stats['saved_seconds']:.1f}s"
+    )
+
+
+# 메모리 LRU 캐시 (TTL 만료 + 최대 개수 제한)
+class TTLCache:
+    def __init__(self, max_entries=1024, ttl=3600):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self._ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# 검색어 정규화 (공백 정리)
+def normalize_query(text):
+    return " ".join(str(text).split())
+
+
+_query_embedding_cache = TTLCache(
+    max_entries=int(os.environ.get('QUERY_CACHE_MAX_ENTRIES', 1024)),
+    ttl=float(os.environ.get('QUERY_CACHE_TTL', 6 * 3600))
+)
+
+
+def get_query_embedding_cache():
+    return _query_embedding_cache
+
+
+# 키워드 목록 정규화 (순서 유지, 공백 정리)
+def normalize_keywords(keyword_list):
+    if isinstance(keyword_list, list):
+        return tuple(normalize_query(keyword) for keyword in keyword_list)
+    return (normalize_query(keyword_list),)
+
+
+_response_cache = TTLCache(
+    max_entries=int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 512)),
+    ttl=float(os.environ.get('RESPONSE_CACHE_TTL', 3600))
+)
+
+
+# /course 응답 캐시 (키: 정규화된 키워드 + 데이터 버전 + 기준 일자)
+def get_response_cache():
+    return _response_cache
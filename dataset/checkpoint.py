@@ -0,0 +1,147 @@
+import json
+import os
+import time
+from pymilvus import Collection, utility
+from dataset.versioning import resolve_alias
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def get_checkpoint_dir():
+    return os.environ.get('CHECKPOINT_DIR', '.cache/checkpoints')
+
+
+# 전체 재구축(shadow 컬렉션) 진행 상태
+# - collection_name: 삽입 중인 버전 컬렉션
+# - source_date: 원본 API 조회 기준 일자 (이어서 실행해도 같은 기준으로 페이징)
+# - next_page: 다음에 가져올 페이지 (이전 페이지까지는 삽입 완료)
+class IndexingCheckpoint:
+    def __init__(self, job, collection_name, page_size, source_date=None, next_page=0, created_at=None):
+        self.job = job
+        self.collection_name = collection_name
+        self.page_size = page_size
+        self.source_date = source_date
+        self.next_page = next_page
+        self.created_at = created_at or time.time()
+        self.resumed = False
+        self.aborted = False
+        self._frozen = False
+
+    @property
+    def path(self):
+        return os.path.join(get_checkpoint_dir(), f"{self.job}.json")
+
+    def save(self):
+        os.makedirs(get_checkpoint_dir(), exist_ok=True)
+        state = {
+            "job": self.job,
+            "collection": self.collection_name,
+            "page_size": self.page_size,
+            "source_date": self.source_date,
+            "next_page": self.next_page,
+            "created_at": self.created_at,
+            "updated_at": time.time()
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    # 페이지 삽입 완료 → 다음 페이지부터 이어서 실행
+    def commit_page(self, page):
+        if self._frozen:
+            return
+        self.next_page = page + 1
+        self.save()
+
+    # 삽입에 실패한 페이지가 있으면 그 이후로는 진행 위치를 옮기지 않음
+    def mark_failed(self, page):
+        if not self._frozen:
+            print(f"[{self.job}] page {page + 1} 삽입 실패, 체크포인트를 page {self.next_page + 1}에 고정합니다.")
+        self._frozen = True
+
+    # 원본 수집 실패: 컬렉션을 활성화하지 않고 다음 실행에서 이어서 진행
+    def abort(self):
+        self.aborted = True
+
+    # 삽입에 실패한 페이지가 있으면 누락된 행이 있으므로 컬렉션을 활성화하지 않음
+    @property
+    def failed(self):
+        return self._frozen
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def load_checkpoint(job):
+    path = os.path.join(get_checkpoint_dir(), f"{job}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        print(f"체크포인트 '{path}'를 읽을 수 없습니다: {e}")
+        return None
+
+    return IndexingCheckpoint(
+        job=state["job"],
+        collection_name=state["collection"],
+        page_size=state["page_size"],
+        source_date=state.get("source_date"),
+        next_page=state["next_page"],
+        created_at=state.get("created_at")
+    )
+
+
+# 이어서 실행할 수 있는 체크포인트와 그 shadow 컬렉션 (없으면 None, None)
+# 페이지 크기가 다르거나, 너무 오래됐거나, 컬렉션/스키마가 맞지 않으면 폐기
+def resume_checkpoint(job, fields, page_size):
+    checkpoint = load_checkpoint(job)
+    if checkpoint is None:
+        return None, None
+
+    max_age = float(os.environ.get('CHECKPOINT_MAX_AGE', 24 * 3600))
+    reason = None
+    if checkpoint.page_size != page_size:
+        reason = f"페이지 크기 변경 ({checkpoint.page_size} → {page_size})"
+    elif time.time() - checkpoint.created_at > max_age:
+        reason = "체크포인트 만료"
+    elif not utility.has_collection(checkpoint.collection_name):
+        reason = f"컬렉션 '{checkpoint.collection_name}' 없음"
+    else:
+        collection = Collection(checkpoint.collection_name)
+        stored_fields = [(field.name, field.dtype) for field in collection.schema.fields]
+        if stored_fields != [(field.name, field.dtype) for field in fields]:
+            reason = "스키마 변경"
+
+    if reason is not None:
+        print(f"[{job}] 체크포인트를 사용하지 않습니다: {reason}")
+        discard_checkpoint(checkpoint)
+        return None, None
+
+    checkpoint.resumed = True
+    print(f"[{job}] 체크포인트에서 이어서 실행: '{checkpoint.collection_name}' page {checkpoint.next_page + 1}부터")
+    return checkpoint, collection
+
+
+# 체크포인트와 (서비스 중이 아닌) 미완성 shadow 컬렉션 삭제
+def discard_checkpoint(checkpoint):
+    alias = checkpoint.job
+    name = checkpoint.collection_name
+    try:
+        if utility.has_collection(name) and name != alias and resolve_alias(alias) != name:
+            utility.drop_collection(name)
+            print(f"미완성 컬렉션 '{name}'을 삭제했습니다.")
+    except Exception as e:
+        print(f"미완성 컬렉션 '{name}' 삭제 오류: {e}")
+    checkpoint.clear()
+
+
+# 새 전체 재구축 시작 (page 0)
+def start_checkpoint(job, collection_name, page_size, source_date=None):
+    checkpoint = IndexingCheckpoint(job, collection_name, page_size, source_date)
+    checkpoint.save()
+    return checkpoint
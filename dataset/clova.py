@@ -1,12 +1,21 @@
 import json
-import http.client
-import requests
+import threading
 from dotenv import load_dotenv
 import os
+from dataset.session import base_url, get_http_session, get_http_timeout
+from dataset.ratelimit import RateLimitError
+from dataset.cache import get_query_embedding_cache, normalize_query
 
 load_dotenv()
 
 
+# 임베딩 API 오류 응답 (status.code 가 20000 이 아님)
+class EmbeddingError(Exception):
+    def __init__(self, status):
+        super().__init__(f"Embedding API error: {status}")
+        self.status = status
+
+
 # embedding API
 class EmbeddingExecutor:
     def __init__(self, host, api_key, api_key_primary_val, request_id):
@@ -15,28 +24,50 @@ class EmbeddingExecutor:
         self._api_key_primary_val = api_key_primary_val
         self._request_id = request_id
 
-    def _send_request(self, completion_request):
-        headers = {
+    # 캐시 키에 사용하는 모델 식별자 (호스트 + 임베딩 모델 경로)
+    @property
+    def model_id(self):
+        return f"{self._host}{os.environ.get('CLOVASTUDIO_EMBEDDING_URL')}"
+
+    def url(self):
+        return base_url(self._host) + os.environ.get('CLOVASTUDIO_EMBEDDING_URL')
+
+    def headers(self):
+        return {
             'Content-Type': 'application/json; charset=utf-8',
             'X-NCP-CLOVASTUDIO-API-KEY': self._api_key,
             'X-NCP-APIGW-API-KEY': self._api_key_primary_val,
             'X-NCP-CLOVASTUDIO-REQUEST-ID': self._request_id
         }
 
-        conn = http.client.HTTPSConnection(self._host)
-        conn.request('POST', os.environ.get('CLOVASTUDIO_EMBEDDING_URL'), json.dumps(completion_request), headers)
-        response = conn.getresponse()
-        result = json.loads(response.read().decode(encoding='utf-8'))
-        conn.close()
+    def _send_request(self, completion_request):
+        # 공유 세션의 keep-alive 커넥션 재사용
+        response = get_http_session().post(
+            self.url(),
+            data=json.dumps(completion_request),
+            headers=self.headers(),
+            timeout=get_http_timeout()
+        )
+
+        # 429: 호출 측에서 Retry-After 만큼 대기 후 재시도
+        if response.status_code == 429:
+            raise RateLimitError(response.headers.get('Retry-After'))
+
+        result = json.loads(response.content.decode(encoding='utf-8'))
         return result
 
     def execute(self, completion_request):
-        res = self._send_request(completion_request)
+        return self.parse(self._send_request(completion_request))
+
+    # 응답 본문 → 임베딩 (동기 / 비동기 경로 공용)
+    @staticmethod
+    def parse(res):
         if res['status']['code'] == '20000':
             return res['result']['embedding']
+        elif res['status']['code'].startswith('429'):
+            raise RateLimitError()
         else:
-            print(res)
-            return 'Error'
+            raise EmbeddingError(res['status'])
 
     @staticmethod
     def create_chunked_festival(data):
@@ -93,8 +124,11 @@ class CompletionExecutor:
         self._api_key_primary_val = api_key_primary_val
         self._request_id = request_id
  
-    def execute(self, completion_request):
-        headers = {
+    def url(self):
+        return base_url(self._host) + os.environ.get('CLOVASTUDIO_MODEL_URL')
+
+    def headers(self):
+        return {
             "X-NCP-CLOVASTUDIO-API-KEY": self._api_key,
             "X-NCP-APIGW-API-KEY": self._api_key_primary_val,
             "X-NCP-CLOVASTUDIO-REQUEST-ID": self._request_id,
@@ -102,35 +136,93 @@ class CompletionExecutor:
             "Accept": "text/event-stream"
         }
  
-        response = requests.post(
-            self._host + os.environ.get('CLOVASTUDIO_MODEL_URL'),
-            headers=headers,
+    def execute(self, completion_request):
+        # 공유 세션 사용, 응답을 닫아 커넥션을 풀에 반환
+        with get_http_session().post(
+            self.url(),
+            headers=self.headers(),
             json=completion_request,
-            stream=True
-        )
+            stream=True,
+            timeout=get_http_timeout()
+        ) as response:
+ 
+            # 스트림에서 마지막 'data:' 라인을 찾기 위한 로직
+            last_data_content = ""
  
-        # 스트림에서 마지막 'data:' 라인을 찾기 위한 로직
-        last_data_content = ""
+            for line in response.iter_lines():
+                if line:
+                    decoded_line = line.decode("utf-8")
+                    if '"data":"[DONE]"' in decoded_line:
+                        break
+                    if decoded_line.startswith("data:"):
+                        last_data_content = json.loads(decoded_line[5:])["message"]["content"]
  
-        for line in response.iter_lines():
-            if line:
+        return last_data_content
+
+    # 'token' 이벤트의 content 를 도착하는 대로 반환
+    def stream(self, completion_request):
+        with get_http_session().post(
+            self.url(),
+            headers=self.headers(),
+            json=completion_request,
+            stream=True,
+            timeout=get_http_timeout()
+        ) as response:
+            response.raise_for_status()
+            event = None
+            for line in response.iter_lines():
+                if not line:
+                    continue
                 decoded_line = line.decode("utf-8")
                 if '"data":"[DONE]"' in decoded_line:
                     break
-                if decoded_line.startswith("data:"):
-                    last_data_content = json.loads(decoded_line[5:])["message"]["content"]
- 
-        return last_data_content
-            
+                if decoded_line.startswith("event:"):
+                    event = decoded_line[6:].strip()
+                elif decoded_line.startswith("data:") and event == "token":
+                    yield json.loads(decoded_line[5:])["message"]["content"]
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+# 프로세스 전체에서 공유하는 임베딩 executor
+def get_embedding_executor():
+    with _executors_lock:
+        if "embedding" not in _executors:
+            _executors["embedding"] = EmbeddingExecutor(
+                host=os.environ.get('CLOVASTUDIO_EMBEDDING_HOST'),
+                api_key=os.environ.get('CLOVASTUDIO_EMBEDDING_API_KEY'),
+                api_key_primary_val=os.environ.get('CLOVASTUDIO_EMBEDDING_APIGW_API_KEY'),
+                request_id=os.environ.get('CLOVASTUDIO_EMBEDDING_REQUEST_ID'),
+            )
+        return _executors["embedding"]
+
+
+# 프로세스 전체에서 공유하는 ClovaX executor
+def get_completion_executor():
+    with _executors_lock:
+        if "completion" not in _executors:
+            _executors["completion"] = CompletionExecutor(
+                host=os.environ.get('CLOVASTUDIO_MODEL_HOST'),
+                api_key=os.environ.get('CLOVASTUDIO_MODEL_API_KEY'),
+                api_key_primary_val=os.environ.get('CLOVASTUDIO_MODEL_APIGW_API_KEY'),
+                request_id=os.environ.get('CLOVASTUDIO_MODEL_REQUEST_ID'),
+            )
+        return _executors["completion"]
+
+
+# 검색어 임베딩 (정규화된 검색어 기준 LRU 캐시 우선)
 def query_embed(text: str):
-    embedding_executor = EmbeddingExecutor(
-        host=os.environ.get('CLOVASTUDIO_EMBEDDING_HOST'),
-        api_key=os.environ.get('CLOVASTUDIO_EMBEDDING_API_KEY'),
-        api_key_primary_val=os.environ.get('CLOVASTUDIO_EMBEDDING_APIGW_API_KEY'),
-        request_id=os.environ.get('CLOVASTUDIO_EMBEDDING_REQUEST_ID'),
-    )
-
-    request_data = {"text": text}
+    query = normalize_query(text)
+    cached = get_query_embedding_cache().get(query)
+    if cached is not None:
+        return cached
+
+    embedding_executor = get_embedding_executor()
+
+    request_data = {"text": query}
     response_data = embedding_executor.execute(request_data)
+    get_query_embedding_cache().put(query, response_data)
 
-    return response_data
\ No newline at end of file
+    return response_data
@@ -0,0 +1,35 @@
+from dataset.district import DISTRICT_COLLECTIONS, DISTRICT_FIELD, district_columns, item_district
+from dataset.eventdate import EVENT_COLLECTIONS, EVENT_DATE_FIELDS, event_date_columns, event_item_dates
+
+
+# 컬렉션별 scalar 필드 (스키마에서 embedding 뒤의 필드, entities 의 [ids, texts, embeddings] 뒤 컬럼 순서)
+def scalar_fields(alias):
+    if alias in EVENT_COLLECTIONS:
+        return EVENT_DATE_FIELDS
+    if alias in DISTRICT_COLLECTIONS:
+        return (DISTRICT_FIELD,)
+    return ()
+
+
+# 원본 항목의 scalar 필드 값 ({필드: 값}, 청크 생성 시 계산)
+def item_columns(alias, item):
+    if alias in EVENT_COLLECTIONS:
+        return event_item_dates(item)
+    if alias in DISTRICT_COLLECTIONS:
+        return {DISTRICT_FIELD: item_district(item)}
+    return {}
+
+
+# 원본 항목 없이 저장된 text 에서 scalar 컬럼 복원 ({필드: 값 목록}, 필드가 없던 행 / 파일용)
+def legacy_columns(alias, texts):
+    if alias in EVENT_COLLECTIONS:
+        return event_date_columns(texts)
+    if alias in DISTRICT_COLLECTIONS:
+        return district_columns(texts)
+    return {}
+
+
+# entities 의 scalar 컬럼 → 행별 {필드: 값} 목록 (재시도 큐 저장용)
+def column_rows(entities, fields):
+    return [dict(zip(fields, values)) for values in zip(*entities[3:3 + len(fields)])] if fields \
+        else [{} for _ in entities[0]]
@@ -0,0 +1,80 @@
+import json
+
+# 검색 결과 컬렉션 → 응답 필드
+RESULT_FIELDS = {
+    "festival_hereforus": "festival_results",
+    "performance_hereforus": "performance_results",
+    "food_hereforus": "food_results"
+}
+
+
+# 컬렉션별로 데이터 분리
+def split_results(data):
+    return {
+        field: [item for item in data if item["collection"] == collection_name]
+        for collection_name, field in RESULT_FIELDS.items()
+    }
+
+
+# 데이트 코스 추천 프롬프트 및 ClovaX 요청 생성
+def build_course_request(keyword_list, results):
+    # 축제, 공연, 음식점 각각의 text 리스트 생성
+    festival_texts = [item["text"] for item in results["festival_results"]]
+    performance_texts = [item["text"] for item in results["performance_results"]]
+    food_texts = [item["text"] for item in results["food_results"]]
+
+    preset_text = [
+    {
+        "role": "system",
+        "content": (
+            f"- {keyword_list[0]}에 있는 {keyword_list[3]} 시간대부터 {keyword_list[1]}에서 놀 만한 {keyword_list[2]} 분위기의 {keyword_list[5]}이 있는 장소들과 {keyword_list[4]} 종류의 음식점 한 곳을 포함한 데이트 코스를 추천해줘.\n\n"
+            "-  장소를 **시간대별로** 1시간 간격으로 추천해줘. 동선이 효율적이도록 고려해서 장소 간 이동이 효율적이도록 합니다. \n"
+            "- 각 장소의 방문 이유와 예상 활동을 간단히 설명해주세요.\n"
+            "- 시간대에 맞는 장소를 추천합니다. 특히 음식점은 한 번 정도만 추천하는 것이 적당합니다."
+            "- 음식점과 공연, 축제에 대한 정보는 반드시 reference에 포함된 음식점 정보를 반드시 활용하여 추천합니다.\n"
+            "- 행사의 일정이나 기간은 나오지 않도록 합니다."
+            "- 답변 형식:\n"
+            "  - 반드시 친근한 반말로 답변해야 합니다.\n"
+        )
+    }
+    ]
+
+    preset_text.append(
+        {
+            "role": "assistant",
+            "content": f"reference: {festival_texts}"
+        }
+    )
+
+    preset_text.append(
+        {
+            "role": "assistant",
+            "content": f"reference: {performance_texts}"
+        }
+    )
+
+    preset_text.append(
+        {
+            "role": "assistant",
+            "content": f"reference: {food_texts}"
+        }
+    )
+
+    print(preset_text)
+
+    return {
+        'messages': preset_text,
+        'topP': 0.2,
+        'topK': 0,
+        'maxTokens': 1024,
+        'temperature': 0.7,
+        'repeatPenalty': 5.0,
+        'stopBefore': [],
+        'includeAiFilters': True,
+        'seed': 0
+    }
+
+
+# server-sent event 한 건
+def format_sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
@@ -0,0 +1,114 @@
+import hashlib
+import json
+from pymilvus import Collection, utility
+
+
+def text_fingerprint(text):
+    return hashlib.sha1(text.encode("utf-8")).digest()
+
+
+# 컬렉션에 저장된 행을 페이지 단위로 순회
+def iterate_rows(collection, output_fields, batch_size=1000):
+    iterator = collection.query_iterator(batch_size=batch_size, output_fields=output_fields)
+    try:
+        while True:
+            rows = iterator.next()
+            if not rows:
+                break
+            yield from rows
+    finally:
+        iterator.close()
+
+
+# embedding 인덱스 존재 여부 (scalar 인덱스가 함께 있으면 has_index() 는 인덱스 이름을 요구함)
+def has_vector_index(collection):
+    return any(index.field_name == "embedding" for index in collection.indexes)
+
+
+# 기존 컬렉션 재사용 (스키마가 다르면 None 반환 → 전체 재생성)
+def open_existing_collection(collection_name, fields, index_params):
+    if not utility.has_collection(collection_name):
+        return None
+
+    collection = Collection(collection_name)
+    stored_fields = [(field.name, field.dtype) for field in collection.schema.fields]
+    expected_fields = [(field.name, field.dtype) for field in fields]
+    if stored_fields != expected_fields:
+        print(f"컬렉션 '{collection_name}'의 스키마가 변경되어 전체 재생성합니다.")
+        return None
+
+    if not has_vector_index(collection):
+        collection.create_index(field_name="embedding", index_params=index_params)
+    collection.load()
+    print(f"기존 컬렉션 '{collection_name}'을 재사용합니다. (delta 모드)")
+    return collection
+
+
+# 원본 데이터와 저장된 데이터를 비교해 변경분만 반영
+class DeltaSync:
+    def __init__(self, collection):
+        self.collection = collection
+        self.stored = {
+            row["id"]: text_fingerprint(row["text"])
+            for row in iterate_rows(collection, ["id", "text"])
+        }
+        self.seen = set()
+        self.aborted = False
+
+        # 통계
+        self.new = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.deleted = 0
+
+    # 신규/변경된 청크만 남기고 나머지는 건너뜀
+    def filter(self, chunked_data):
+        pending = []
+        for chunk in chunked_data:
+            self.seen.add(chunk["id"])
+            stored = self.stored.get(chunk["id"])
+            if stored is None:
+                self.new += 1
+                pending.append(chunk)
+            elif stored != text_fingerprint(chunk["text"]):
+                self.changed += 1
+                pending.append(chunk)
+            else:
+                self.unchanged += 1
+        return pending
+
+    # 원본 수집이 중간에 실패하면 만료 삭제를 하지 않음
+    def abort(self):
+        self.aborted = True
+
+    def upsert(self, entities):
+        if entities[0]:
+            self.collection.upsert(entities)
+
+    # 원본에서 사라진 (만료된) 행 삭제
+    def delete_expired(self, batch_size=1000):
+        if self.aborted:
+            print("데이터 수집이 중단되어 만료 데이터 삭제를 건너뜁니다.")
+            return
+
+        expired = [pk for pk in self.stored if pk not in self.seen]
+        for start in range(0, len(expired), batch_size):
+            batch = expired[start:start + batch_size]
+            # places 카테고리 adapter 는 자체 pk 형식으로 삭제
+            if hasattr(self.collection, "delete_ids"):
+                self.collection.delete_ids(batch)
+            else:
+                self.collection.delete(expr=f"id in {format_pk_list(batch)}")
+        self.deleted = len(expired)
+
+    def print_summary(self):
+        print(
+            f"Delta 반영: 신규 {self.new}, 변경 {self.changed}, "
+            f"유지 {self.unchanged}, 삭제 {self.deleted}"
+        )
+
+
+def format_pk_list(pks):
+    if pks and isinstance(pks[0], str):
+        return "[" + ", ".join(json.dumps(pk, ensure_ascii=False) for pk in pks) + "]"
+    return "[" + ", ".join(str(pk) for pk in pks) + "]"
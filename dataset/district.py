@@ -0,0 +1,74 @@
+import re
+import numpy as np
+
+# 자치구 필드가 있는 컬렉션 (gu_name, 전용 컬렉션에서는 partition key)
+DISTRICT_COLLECTIONS = ("food_hereforus",)
+DISTRICT_FIELD = "gu_name"
+
+# 자치구를 알 수 없는 행
+DISTRICT_UNKNOWN = ""
+
+SEOUL_DISTRICTS = (
+    "종로구", "중구", "용산구", "성동구", "광진구", "동대문구", "중랑구", "성북구", "강북구", "도봉구",
+    "노원구", "은평구", "서대문구", "마포구", "양천구", "강서구", "구로구", "금천구", "영등포구", "동작구",
+    "관악구", "서초구", "강남구", "송파구", "강동구"
+)
+
+# create_chunked_food 가 만든 text 의 자치구 부분 (자치구 필드가 없던 행 복원용)
+_DISTRICT_PATTERN = re.compile(r"자치구는 (?P<gu>[^,]*),")
+
+# 긴 이름부터 비교 ('동대문' 이 '대문' 보다 먼저), 1글자 줄임말('중')은 사용하지 않음
+_DISTRICT_NAMES = sorted(SEOUL_DISTRICTS, key=len, reverse=True)
+_DISTRICT_STEMS = [(name[:-1], name) for name in _DISTRICT_NAMES if len(name) > 2]
+
+
+# 원본 항목의 guName → gu_name (없거나 '정보없음' 이면 알 수 없는 자치구)
+def item_district(item):
+    gu = item.get("guName")
+    if not isinstance(gu, str) or not gu.strip() or gu.strip() == "정보없음":
+        return DISTRICT_UNKNOWN
+    return gu.strip()[:32]
+
+
+# 자치구 필드가 없던 행을 옮길 때만 사용 (원본 항목이 없으므로 저장된 text 에서 복원)
+def parse_district(text):
+    match = _DISTRICT_PATTERN.search(text)
+    if match is None:
+        return DISTRICT_UNKNOWN
+    gu = match.group("gu").strip()
+    return DISTRICT_UNKNOWN if gu == "정보없음" else gu[:32]
+
+
+# 저장된 text 에서 gu_name 컬럼 복원 (자치구 필드가 없던 행 / 스냅샷용)
+def district_columns(texts):
+    return {DISTRICT_FIELD: [parse_district(text) for text in texts]}
+
+
+# 지역 키워드 → 자치구 ('강남구', '서울 강남구', '강남역' → '강남구', 알 수 없으면 None)
+def find_district(location):
+    if not isinstance(location, str):
+        return None
+    location = re.sub(r"\s+", "", location)
+    for name in _DISTRICT_NAMES:
+        if name in location:
+            return name
+    for stem, name in _DISTRICT_STEMS:
+        if stem in location:
+            return name
+    return None
+
+
+# /course 요청의 검색 자치구 (keyword_list[0] 이 지역)
+def course_district(keyword_list):
+    if isinstance(keyword_list, list) and keyword_list:
+        return find_district(keyword_list[0])
+    return None
+
+
+def district_expr(district):
+    return f'{DISTRICT_FIELD} == "{district}"'
+
+
+# 스냅샷 검색용 자치구 mask
+def district_mask(districts, district):
+    return np.asarray(districts) == district
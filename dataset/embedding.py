@@ -0,0 +1,83 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from tqdm import tqdm
+from dataset.cache import get_embedding_cache
+from dataset.metrics import API_RATE_LIMITED, API_RETRIES, EMBEDDING_FAILURES, EMBEDDING_REQUEST_SECONDS
+from dataset.ratelimit import RateLimitError, get_embedding_rate_limiter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# 캐시 확인 후 없을 때만 토큰을 받아 API 호출 (429면 감속 후 재시도)
+def embed_text(embedding_executor, text, rate_limiter=None, cache=None, max_retries=5):
+    rate_limiter = rate_limiter or get_embedding_rate_limiter()
+    cache = cache or get_embedding_cache()
+
+    embedding = cache.get(embedding_executor.model_id, text)
+    if embedding is not None:
+        return embedding
+
+    for attempt in range(max_retries):
+        rate_limiter.acquire()
+        started = time.time()
+        try:
+            embedding = embedding_executor.execute({"text": text})
+        except RateLimitError as e:
+            print(f"Embedding rate limit exceeded. Backing off... (Attempt {attempt + 1}/{max_retries})")
+            API_RATE_LIMITED.labels("embedding").inc()
+            if attempt + 1 < max_retries:
+                API_RETRIES.labels("embedding").inc()
+            rate_limiter.penalize(e.retry_after)
+            continue
+        finally:
+            EMBEDDING_REQUEST_SECONDS.observe(time.time() - started)
+
+        rate_limiter.reward()
+        cache.put(embedding_executor.model_id, text, embedding, time.time() - started)
+        return embedding
+
+    raise RateLimitError()
+
+
+# 청크 목록을 워커 풀로 병렬 임베딩해 완료 순서대로 (id, text, embedding) 반환
+# 동시에 대기 중인 결과가 max_in_flight의 2배를 넘지 않도록 순차 제출
+# 실패 항목은 제외하고 on_failure(chunk, error) 로 전달 (나머지는 그대로 진행)
+def iter_embeddings(embedding_executor, chunked_data, max_in_flight=None, on_failure=None):
+    max_in_flight = max_in_flight or int(os.environ.get('EMBEDDING_MAX_IN_FLIGHT', 4))
+    chunks = iter(chunked_data)
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending[executor.submit(embed_text, embedding_executor, chunk["text"])] = chunk
+
+        for _ in range(max_in_flight * 2):
+            submit_next()
+
+        with tqdm(total=len(chunked_data)) as progress:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    submit_next()
+                    progress.update(1)
+                    try:
+                        embedding = future.result()
+                    except Exception as e:
+                        print(f"Embedding error for ID {chunk['id']}: {e}")
+                        EMBEDDING_FAILURES.inc()
+                        if on_failure is not None:
+                            on_failure(chunk, e)
+                        continue
+                    yield chunk["id"], chunk["text"], embedding
+
+
+def embed_chunks(embedding_executor, chunked_data, max_in_flight=None):
+    return [
+        {"id": pk, "text": text, "embedding": embedding}
+        for pk, text, embedding in iter_embeddings(embedding_executor, chunked_data, max_in_flight)
+    ]
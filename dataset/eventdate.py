@@ -0,0 +1,79 @@
+import re
+from datetime import datetime
+import numpy as np
+
+# 기간이 있는 행사 컬렉션 (open_date / end_date scalar 필드 + 인덱스)
+EVENT_COLLECTIONS = ("festival_hereforus", "performance_hereforus")
+EVENT_DATE_FIELDS = ("open_date", "end_date")
+
+# 일자를 알 수 없으면 항상 진행 중인 것으로 취급
+OPEN_DATE_UNKNOWN = 0
+END_DATE_UNKNOWN = 99991231
+
+# create_chunked_festival / create_chunked_performance 가 만든 text 의 일자 부분 (일자 필드가 없던 행 복원용)
+_DATE_PATTERN = re.compile(r"시작 일자는 (?P<open>[^,]*), .*?종료 일자는 (?P<end>[^,]*),")
+_DIGITS_PATTERN = re.compile(r"\d+")
+
+
+# 'YYYY-MM-DD', 'YYYY.MM.DD', 'YYYYMMDD' → YYYYMMDD 정수 (형식이 다르면 None)
+def date_to_int(value):
+    if value is None:
+        return None
+    parts = _DIGITS_PATTERN.findall(str(value))
+    if len(parts) == 1 and len(parts[0]) == 8:
+        parts = [parts[0][:4], parts[0][4:6], parts[0][6:]]
+    if len(parts) < 3:
+        return None
+    try:
+        return int(datetime(int(parts[0]), int(parts[1]), int(parts[2])).strftime('%Y%m%d'))
+    except ValueError:
+        return None
+
+
+# 추천 기준 일자 (요청의 'YYYY-MM-DD', 없거나 형식이 다르면 오늘)
+def course_date(value=None):
+    return date_to_int(value) or int(datetime.now().strftime('%Y%m%d'))
+
+
+# 원본 항목의 openDate / endDate → open_date / end_date (형식이 다르면 항상 진행 중인 값)
+def event_item_dates(item):
+    return {
+        "open_date": date_to_int(item.get("openDate")) or OPEN_DATE_UNKNOWN,
+        "end_date": date_to_int(item.get("endDate")) or END_DATE_UNKNOWN
+    }
+
+
+# 일자 필드가 없던 컬렉션의 행을 옮길 때만 사용 (원본 항목이 없으므로 저장된 text 에서 복원)
+def parse_event_dates(text):
+    match = _DATE_PATTERN.search(text)
+    if match is None:
+        return OPEN_DATE_UNKNOWN, END_DATE_UNKNOWN
+    return (
+        date_to_int(match.group("open")) or OPEN_DATE_UNKNOWN,
+        date_to_int(match.group("end")) or END_DATE_UNKNOWN
+    )
+
+
+# 저장된 text 에서 open_date / end_date 컬럼 복원 (일자 필드가 없던 행 / 스냅샷용)
+def event_date_columns(texts):
+    dates = [parse_event_dates(text) for text in texts]
+    return {
+        "open_date": [open_date for open_date, _ in dates],
+        "end_date": [end_date for _, end_date in dates]
+    }
+
+
+# 기준 일자에 진행 중인 행사만 검색하는 Milvus 필터
+def active_date_expr(date):
+    return f"open_date <= {date} and end_date >= {date}"
+
+
+# 스냅샷 검색용 진행 여부 mask
+def active_date_mask(open_dates, end_dates, date):
+    return (np.asarray(open_dates) <= date) & (np.asarray(end_dates) >= date)
+
+
+# open_date / end_date 정렬 인덱스 (필터 검색 시 전체 scan 대신 범위 조회)
+def create_event_date_indexes(collection):
+    for field in EVENT_DATE_FIELDS:
+        collection.create_index(field_name=field, index_name=field, index_params={"index_type": "STL_SORT"})
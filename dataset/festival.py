@@ -3,6 +3,21 @@ import requests
 from pymilvus import connections, Collection, FieldSchema, CollectionSchema, DataType, utility
 from tqdm import tqdm
 from dataset.clova import *
+from dataset.cache import *
+from dataset.delta import *
+from dataset.versioning import *
+from dataset.embedding import *
+from dataset.pipeline import *
+from dataset.registry import *
+from dataset.places import *
+from dataset.snapshot import *
+from dataset.metrics import *
+from dataset.checkpoint import *
+from dataset.retryqueue import *
+from dataset.bulkload import *
+from dataset.indexconfig import *
+from dataset.indexing import *
+from dataset.eventdate import *
 from dotenv import load_dotenv
 from datetime import datetime
 import os
@@ -21,38 +36,30 @@ def connect_to_milvus():
     except Exception as e:
         print(f"Milvus 연결 오류: {e}")
 
-# Milvus 컬렉션 설정
-def setup_collection():
-    collection_name = "festival_hereforus"
-
-    # 기존 컬렉션 삭제 후 재생성
-    if utility.has_collection(collection_name):
-        utility.drop_collection(collection_name)
-        print(f"기존 컬렉션 '{collection_name}'을 삭제했습니다.")
-
-    # 필드 및 스키마 정의
-    fields = [
-        FieldSchema(name="id", dtype=DataType.VARCHAR, max_length=256, is_primary=True),
-        FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=9000),
-        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1024)
-    ]
-    schema = CollectionSchema(fields, description="sw_project")
-    
-    # 컬렉션 생성
-    collection = Collection(name=collection_name, schema=schema, using='default', shards_num=2)
-    print(f"컬렉션 '{collection_name}'이 생성되었습니다.")
-    return collection
+# 필드 및 스키마 정의
+fields = [
+    FieldSchema(name="id", dtype=DataType.VARCHAR, max_length=256, is_primary=True),
+    FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=9000),
+    FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1024),
+    # 시작 / 종료 일자 (YYYYMMDD, 진행 중인 행사만 필터 검색)
+    FieldSchema(name="open_date", dtype=DataType.INT64),
+    FieldSchema(name="end_date", dtype=DataType.INT64)
+]
 
 # 페이징 데이터 가져오기
-def fetch_festival_data(page, size, max_retries=5):
-    date = datetime.now().strftime('%Y-%m-%d') 
+# date: 조회 기준 일자 (한 번의 인덱싱 동안 고정, 기본값 오늘)
+def fetch_festival_data(page, size, max_retries=5, date=None):
+    date = date or datetime.now().strftime('%Y-%m-%d')
     url = f"{os.environ.get('FESTIVAL_URL')}?date={date}&page={page}&size={size}"
     retries = 0
     while retries < max_retries:
-        response = requests.get(url)
+        response = get_http_session().get(url, timeout=get_http_timeout())
         if response.status_code == 200:
             return response.json()
         elif response.status_code == 429:  # Too many requests
+            API_RATE_LIMITED.labels("source").inc()
+            if retries + 1 < max_retries:
+                API_RETRIES.labels("source").inc()
             retry_after = int(response.headers.get("Retry-After", 5))  # 헤더 값 또는 기본값
             print(f"Rate limit exceeded. Retrying in {retry_after} seconds... (Attempt {retries + 1}/{max_retries})")
             time.sleep(retry_after)
@@ -62,84 +69,15 @@ def fetch_festival_data(page, size, max_retries=5):
             break
     return {"error": "데이터를 가져오는 데 실패했습니다."}
 
-# 데이터를 청크로 나누기
-def process_batch(collection, page, size, embedding_executor):
-    # 데이터 가져오기
-    data = fetch_festival_data(page, size)
-    if "error" in data or not data["content"]:
-        print("No more data to process or an error occurred.")
-        return False
-
-    print(f"Processing page {page + 1}, size: {size}")
-    chunked_data = []
-
-    # 청크 생성
-    for item in data["content"]:
-        chunked_text = embedding_executor.create_chunked_festival(item)
-        chunked_data.append({
-            "id": item["id"],
-            "text": chunked_text
-        })
-
-    # Embedding 처리
-    embedded_data = []
-    for chunk in tqdm(chunked_data):
-        try:
-            embedding = embedding_executor.execute({"text": chunk["text"]})
-            embedded_data.append({
-                "id": chunk["id"],
-                "text": chunk["text"],
-                "embedding": embedding
-            })
-            time.sleep(1)
-        except Exception as e:
-            print(f"Embedding error for ID {chunk['id']}: {e}")
-
-    # Milvus에 데이터 삽입
-    ids = [item["id"] for item in embedded_data]
-    texts = [item["text"] for item in embedded_data]
-    embeddings = [item["embedding"] for item in embedded_data]
-
-    try:
-        collection.insert([ids, texts, embeddings])
-        print(f"Batch {page + 1}: 데이터 삽입 완료")
-    except Exception as e:
-        print(f"Batch {page + 1}: 데이터 삽입 오류: {e}")
-
-    # 다음 페이지 여부 확인
-    return page + 1 < data["totalPages"]
-    # return page + 1 < 2
-
-# 메인 인덱싱 함수
-def indexing_festival_data(batch_size=2000):
+# 메인 인덱싱 함수 (체크포인트, staging, 재시도 큐, alias 전환은 run_indexing_job 공통 흐름)
+def indexing_festival_data(batch_size=2000, delta=True):
     connect_to_milvus()
-    collection = setup_collection()
-
-    embedding_executor = EmbeddingExecutor(
-        host=os.environ.get('CLOVASTUDIO_EMBEDDING_HOST'),
-        api_key=os.environ.get('CLOVASTUDIO_EMBEDDING_API_KEY'),
-        api_key_primary_val=os.environ.get('CLOVASTUDIO_EMBEDDING_APIGW_API_KEY'),
-        request_id=os.environ.get('CLOVASTUDIO_EMBEDDING_REQUEST_ID')
+    return run_indexing_job(
+        "festival_hereforus", fields,
+        fetch_data=lambda page, size, source_date: fetch_festival_data(page, size, date=source_date),
+        chunk_item=lambda embedding_executor, item: embedding_executor.create_chunked_festival(item),
+        batch_size=batch_size,
+        delta=delta,
+        source_date=datetime.now().strftime('%Y-%m-%d'),
+        create_scalar_indexes=create_event_date_indexes
     )
-
-    # 페이징 처리
-    page = 0
-    while True:
-        more_data = process_batch(collection, page, batch_size, embedding_executor)
-        if not more_data:
-            print("모든 데이터 처리가 완료되었습니다.")
-            break
-        page += 1
-
-    # 인덱스 생성
-    index_params = {
-        "metric_type": "IP",
-        "index_type": "HNSW",
-        "params": {"M": 8, "efConstruction": 200}
-    }
-    collection.create_index(field_name="embedding", index_params=index_params)
-    print("인덱스 생성 완료.")
-
-    # 컬렉션 로드
-    collection.load()
-    print(f"컬렉션 '{collection.name}'이 로드되었습니다.")
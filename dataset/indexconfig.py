@@ -0,0 +1,76 @@
+import copy
+import json
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 설정 파일에 컬렉션 항목이 없을 때 사용하는 값
+DEFAULT_INDEX_PARAMS = {
+    "metric_type": "IP",
+    "index_type": "HNSW",
+    "params": {"M": 8, "efConstruction": 200}
+}
+
+DEFAULT_SEARCH_PARAMS = {"metric_type": "IP", "params": {"ef": 64}}
+
+
+def get_index_config_path():
+    return os.environ.get('INDEX_CONFIG_PATH', 'index_config.json')
+
+
+_index_config = None
+_index_config_lock = threading.Lock()
+
+
+# 컬렉션별 인덱스 / 검색 파라미터 (scripts/hnsw_sweep.py 가 작성)
+# {"food_hereforus": {"index_params": {...}, "search_params": {...}, "measured": {...}}, ...}
+# 파일이 바뀌면 다시 읽으므로 서버를 재시작하지 않아도 다음 검색부터 반영됨
+def load_index_config():
+    global _index_config
+    path = get_index_config_path()
+    try:
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return {}
+
+    with _index_config_lock:
+        if _index_config is not None and _index_config[0] == (path, mtime):
+            return _index_config[1]
+        try:
+            with open(path, encoding="utf-8") as f:
+                config = json.load(f)
+        except ValueError as e:
+            print(f"인덱스 설정 '{path}'를 읽을 수 없습니다: {e}")
+            config = {}
+        _index_config = ((path, mtime), config)
+        return config
+
+
+def get_index_params(collection_name):
+    params = load_index_config().get(collection_name, {}).get("index_params")
+    return copy.deepcopy(params or DEFAULT_INDEX_PARAMS)
+
+
+def get_search_params(collection_name):
+    params = load_index_config().get(collection_name, {}).get("search_params")
+    return copy.deepcopy(params or DEFAULT_SEARCH_PARAMS)
+
+
+# 설정 파일의 한 컬렉션 항목 교체 (다른 컬렉션 항목은 유지)
+def save_index_config(collection_name, entry, path=None):
+    path = path or get_index_config_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        config = {}
+
+    config[collection_name] = entry
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    os.replace(f"{path}.tmp", path)
@@ -0,0 +1,189 @@
+from dataset.bulkload import drop_old_staging, load_staging, open_staging
+from dataset.cache import print_cache_stats
+from dataset.checkpoint import resume_checkpoint, start_checkpoint
+from dataset.clova import get_embedding_executor
+from dataset.columns import column_rows, item_columns, scalar_fields
+from dataset.delta import DeltaSync, has_vector_index, open_existing_collection
+from dataset.embedding import iter_embeddings
+from dataset.indexconfig import get_index_params
+from dataset.pipeline import run_paging_pipeline
+from dataset.places import PLACES_COLLECTION, is_places_layout, open_places_category
+from dataset.registry import bump_data_version
+from dataset.retryqueue import drain_retry_queue, get_retry_queue
+from dataset.snapshot import export_snapshot, is_snapshot_export_enabled
+from dataset.versioning import activate_collection, create_shadow_collection
+
+
+# Milvus 컬렉션 설정
+def setup_indexing_collection(alias, fields, delta=False, num_partitions=None):
+    # delta 모드에서는 기존 컬렉션(인덱스, 로드 상태 포함)을 그대로 사용
+    if delta:
+        collection = open_existing_collection(alias, fields, get_index_params(alias))
+        if collection is not None:
+            return collection
+
+    # 서비스 중인 컬렉션은 그대로 두고 새 버전 컬렉션에 재구축
+    return create_shadow_collection(alias, fields, num_partitions)
+
+
+# 데이터를 청크로 나누고 임베딩 (pipeline embed 단계)
+# scalar 필드(행사 일자, 자치구)는 text 가 아닌 원본 항목에서 가져와 (id, text, embedding, columns) 로 전달
+def process_page(alias, page, content, chunk_item, embedding_executor, delta_sync=None):
+    print(f"Processing page {page + 1}, size: {len(content)}")
+    chunked_data = []
+
+    # 청크 생성
+    for item in content:
+        chunked_data.append({
+            "id": item["id"],
+            "text": chunk_item(embedding_executor, item),
+            "columns": item_columns(alias, item)
+        })
+
+    # delta 모드에서는 신규/변경 항목만 임베딩
+    if delta_sync is not None:
+        chunked_data = delta_sync.filter(chunked_data)
+
+    # Embedding 처리 (캐시에 없는 항목만 토큰 버킷 속도로 병렬 호출, 완료 순서대로 반환)
+    # 실패한 레코드만 재시도 큐에 보관하고 나머지는 그대로 삽입
+    columns = {chunk["id"]: chunk["columns"] for chunk in chunked_data}
+    embedded = iter_embeddings(
+        embedding_executor, chunked_data,
+        on_failure=lambda chunk, error: get_retry_queue().add(
+            alias, chunk["id"], chunk["text"], error, chunk["columns"]
+        )
+    )
+    return ((pk, text, embedding, columns[pk]) for pk, text, embedding in embedded)
+
+
+# Milvus에 데이터 삽입 (pipeline insert 단계, [ids, texts, float32 embeddings, scalar 컬럼...] sub-batch)
+# upsert: 체크포인트에서 이어서 실행하는 재구축 (이미 삽입된 행이 있을 수 있음)
+def insert_page(alias, collection, page, entities, delta_sync=None, upsert=False):
+    try:
+        if delta_sync is not None:
+            delta_sync.upsert(entities)
+        elif upsert:
+            collection.upsert(entities)
+        else:
+            collection.insert(entities)
+        print(f"Batch {page + 1}: {len(entities[0])}건 삽입 완료")
+        return True
+    except Exception as e:
+        print(f"Batch {page + 1}: 데이터 삽입 오류: {e}")
+        get_retry_queue().add_many(alias, entities[0], entities[1], e, column_rows(entities, scalar_fields(alias)))
+        return False
+
+
+# 페이징 원본 API 인덱싱 공통 흐름 (festival / performance / food)
+# - alias: 서비스 컬렉션 이름 (체크포인트, 재시도 큐, 지표의 job 이름으로도 사용)
+# - fetch_data(page, size, source_date): 원본 API 페이지 조회
+# - chunk_item(embedding_executor, item): 임베딩할 text 생성 (scalar 필드는 item_columns 가 원본 항목에서 계산)
+# - source_date: 원본 API 조회 기준 일자 (이어서 실행하면 체크포인트 값 사용)
+# - num_partitions: partition key 필드가 있을 때 partition 수
+# - create_scalar_indexes(collection): 벡터 인덱스 뒤에 만드는 scalar 인덱스
+def run_indexing_job(alias, fields, fetch_data, chunk_item, batch_size=2000, delta=True, source_date=None,
+                     num_partitions=None, create_scalar_indexes=None):
+    checkpoint = None
+
+    # 통합 레이아웃: places 컬렉션의 카테고리 partition 에 항상 delta 반영
+    if is_places_layout():
+        collection = open_places_category(alias)
+        delta_sync = DeltaSync(collection)
+    else:
+        # 중단된 전체 재구축이 있으면 그 shadow 컬렉션에 이어서 삽입
+        checkpoint, collection = resume_checkpoint(alias, fields, batch_size)
+        if checkpoint is not None:
+            source_date = checkpoint.source_date
+            delta_sync = None
+        else:
+            collection = setup_indexing_collection(alias, fields, delta, num_partitions)
+            delta_sync = DeltaSync(collection) if delta and has_vector_index(collection) else None
+            if delta_sync is None:
+                checkpoint = start_checkpoint(alias, collection.name, batch_size, source_date)
+
+    embedding_executor = get_embedding_executor()
+    start_page = checkpoint.next_page if checkpoint is not None else 0
+
+    # BULK_LOAD=true: 전체 재구축은 컬렉션 대신 staging 파일에 쓰고 마지막에 bulk insert
+    staging = open_staging(checkpoint, scalar_fields(alias))
+
+    # 지난 실행에서 실패한 레코드 먼저 처리 (이어서 실행하는 재구축은 지난 페이지를 다시 받지 않으므로 바로 저장)
+    drained = drain_retry_queue(
+        alias, embedding_executor, delta_sync,
+        (staging or collection) if checkpoint is not None and checkpoint.resumed else None
+    )
+
+    def insert_batch(page, entities):
+        if staging is not None:
+            staging.add(page, entities)
+            return
+        # 이어서 실행하는 재구축은 모든 페이지를 upsert
+        # (실패한 페이지 이후에도 지난 실행이 삽입을 계속했으므로 어느 페이지든 이미 저장된 id 가 있을 수 있음)
+        upsert = (checkpoint is not None and checkpoint.resumed) or not drained.isdisjoint(entities[0])
+        if not insert_page(alias, collection, page, entities, delta_sync, upsert) \
+                and checkpoint is not None:
+            checkpoint.mark_failed(page)
+
+    def commit_page(page):
+        if staging is not None:
+            staging.commit_page(page)
+        checkpoint.commit_page(page)
+
+    # 페이징 처리 (다음 페이지 수집, 현재 페이지 임베딩, 이전 페이지 삽입을 동시에 진행)
+    # 전체 재구축은 페이지 삽입이 끝날 때마다 체크포인트 저장
+    stats = run_paging_pipeline(
+        fetch_data=lambda page, size: fetch_data(page, size, source_date),
+        process_batch=lambda page, content: process_page(
+            alias, page, content, chunk_item, embedding_executor, delta_sync
+        ),
+        insert_batch=insert_batch,
+        size=batch_size,
+        on_fetch_error=delta_sync.abort if delta_sync is not None else checkpoint.abort,
+        job=alias,
+        start_page=start_page,
+        on_page_committed=commit_page if checkpoint is not None else None
+    )
+    print("모든 데이터 처리가 완료되었습니다.")
+
+    print_cache_stats()
+
+    # delta 모드: 만료 데이터만 삭제하고 기존 인덱스/로드 상태 유지
+    if delta_sync is not None:
+        delta_sync.delete_expired()
+        delta_sync.print_summary()
+    elif checkpoint.aborted or checkpoint.failed:
+        # 수집 또는 삽입이 중간에 실패하면 미완성 컬렉션으로 전환하지 않음
+        reason = "데이터 수집이 중단되어" if checkpoint.aborted else "삽입에 실패한 페이지가 있어"
+        print(f"{reason} '{collection.name}' 전환을 미룹니다. "
+              f"다음 실행에서 page {checkpoint.next_page + 1}부터 이어서 진행합니다.")
+        return stats
+    else:
+        # staging 파일 bulk insert
+        if staging is not None:
+            collection = load_staging(alias, collection, staging, fields, num_partitions)
+
+        # 인덱스 생성 (index_config.json 의 컬렉션별 파라미터)
+        collection.create_index(field_name="embedding", index_params=get_index_params(alias))
+        if create_scalar_indexes is not None:
+            create_scalar_indexes(collection)
+        print("인덱스 생성 완료.")
+
+        # 컬렉션 로드
+        collection.load()
+        print(f"컬렉션 '{collection.name}'이 로드되었습니다.")
+
+        # 인덱스와 로드가 끝난 뒤 alias 전환 (무중단)
+        activate_collection(alias, collection)
+        checkpoint.clear()
+        if staging is not None:
+            drop_old_staging(alias)
+
+    # NumPy 검색용 스냅샷 내보내기
+    if is_snapshot_export_enabled():
+        try:
+            export_snapshot(collection, alias)
+        except Exception as e:
+            print(f"스냅샷 내보내기 오류: {e}")
+
+    bump_data_version(PLACES_COLLECTION if is_places_layout() else alias)
+    return stats
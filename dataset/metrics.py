@@ -0,0 +1,69 @@
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Prometheus 지표 (GET /metrics 로 노출, 프로세스 기본 registry 사용)
+
+# /course, /course/stream 단계별 시간 (query_embed / search / llm / llm_first_token / total)
+REQUEST_STAGE_SECONDS = Histogram(
+    "hereforus_request_stage_seconds",
+    "Recommendation request time per stage",
+    ["endpoint", "stage"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60)
+)
+
+# 인덱서 pipeline 단계별 배치 처리 시간 (fetch / embed / insert)
+INDEXING_STAGE_SECONDS = Histogram(
+    "hereforus_indexing_stage_seconds",
+    "Indexing pipeline time per batch and stage",
+    ["job", "stage"],
+    buckets=(0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800)
+)
+
+INDEXING_ITEMS = Counter(
+    "hereforus_indexing_items_total",
+    "Items processed by indexing pipeline stage",
+    ["job", "stage"]
+)
+
+# 임베딩 API 1회 호출 시간 (캐시 hit 제외)
+EMBEDDING_REQUEST_SECONDS = Histogram(
+    "hereforus_embedding_request_seconds",
+    "Embedding API call time",
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+# api: embedding / source
+API_RETRIES = Counter(
+    "hereforus_api_retries_total",
+    "Retried API calls",
+    ["api"]
+)
+
+API_RATE_LIMITED = Counter(
+    "hereforus_api_rate_limited_total",
+    "API responses with HTTP 429",
+    ["api"]
+)
+
+EMBEDDING_FAILURES = Counter(
+    "hereforus_embedding_failures_total",
+    "Texts that could not be embedded"
+)
+
+
+# 단계 시간 측정 (with 블록, async 함수 안에서도 사용 가능)
+def time_request_stage(endpoint, stage):
+    return REQUEST_STAGE_SECONDS.labels(endpoint, stage).time()
+
+
+def observe_request_stage(endpoint, stage, seconds):
+    REQUEST_STAGE_SECONDS.labels(endpoint, stage).observe(seconds)
+
+
+def observe_indexing_stage(job, stage, items, seconds):
+    INDEXING_STAGE_SECONDS.labels(job, stage).observe(seconds)
+    INDEXING_ITEMS.labels(job, stage).inc(items)
+
+
+# /metrics 응답 본문과 Content-Type
+def render_metrics():
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -3,6 +3,11 @@ import requests
 from pymilvus import connections, Collection, FieldSchema, CollectionSchema, DataType, utility
 from tqdm import tqdm
 from dataset.clova import *
+from dataset.cache import *
+from dataset.delta import *
+from dataset.versioning import *
+from dataset.embedding import *
+from dataset.indexconfig import *
 from dotenv import load_dotenv
 import os
 
@@ -31,53 +36,45 @@ def chunked_movie_data(embedding_executor):
     return [embedding_executor.create_chunked_movie(item) for item in results]
 
 # 3. Embedding
-def embedding_movie_data():
-    embedding_executor = EmbeddingExecutor(
-        host=os.environ.get('CLOVASTUDIO_EMBEDDING_HOST'),
-        api_key=os.environ.get('CLOVASTUDIO_EMBEDDING_API_KEY'),
-        api_key_primary_val=os.environ.get('CLOVASTUDIO_EMBEDDING_APIGW_API_KEY'),
-        request_id=os.environ.get('CLOVASTUDIO_EMBEDDING_REQUEST_ID')
-    )
+def embedding_movie_data(chunked_text_list=None):
+    embedding_executor = get_embedding_executor()
     
     
-    chunked_text_list = chunked_movie_data(embedding_executor)
-    chunked_html = []
+    if chunked_text_list is None:
+        chunked_text_list = chunked_movie_data(embedding_executor)
+    chunked_data = [{"id": index, "text": text} for index, text in enumerate(chunked_text_list)]
+    chunked_html = [
+        {'text': item['text'], 'embedding': item['embedding']}
+        for item in embed_chunks(embedding_executor, chunked_data)
+    ]
 
-    for chunked_document in tqdm(chunked_text_list):
-        try:
-            response_data = embedding_executor.execute({"text": chunked_document})
-            chunked_html.append({
-                'text': chunked_document,
-                'embedding': response_data,
-            })
-            time.sleep(1)
-        except Exception as e:
-            print(f"Unexpected error: {e}")
+    print_cache_stats()
 
     print(chunked_html)
     return chunked_html
 
 # 4. indexing
-def indexing_movie_data():
+def indexing_movie_data(delta=True):
     connect_to_milvus()
     collection_name = "movie_hereforus"
 
-    # 기존 컬렉션 삭제 후 재생성
-    if utility.has_collection(collection_name):
-        utility.drop_collection(collection_name)
-        print(f"기존 컬렉션 '{collection_name}'을 삭제했습니다.")
-
     # 필드 및 스키마 정의
     fields = [
         FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
         FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=9000),
         FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1024)
     ]
-    schema = CollectionSchema(fields, description="sw_project")
-    
-    # 컬렉션 생성
-    collection = Collection(name=collection_name, schema=schema, using='default', shards_num=2)
-    print(f"컬렉션 '{collection_name}'이 생성되었습니다.")
+
+    # 인덱스 설정 (index_config.json 의 컬렉션별 파라미터)
+    index_params = get_index_params(collection_name)
+
+    # delta 모드: id가 자동 생성되므로 text 기준으로 비교
+    collection = open_existing_collection(collection_name, fields, index_params) if delta else None
+    if collection is not None:
+        return sync_movie_collection(collection)
+
+    # 서비스 중인 컬렉션은 그대로 두고 새 버전 컬렉션에 재구축
+    collection = create_shadow_collection(collection_name, fields)
 
     # 데이터 준비
     chunked_html = embedding_movie_data()
@@ -97,21 +94,47 @@ def indexing_movie_data():
         insert_result = collection.insert(entities)
         print("데이터 Insertion이 완료된 ID:", insert_result.primary_keys)
     except Exception as e:
+        # 미완성 컬렉션으로 전환하지 않고 기존 컬렉션으로 계속 서비스
         print(f"데이터 Insertion 오류: {e}")
+        utility.drop_collection(collection.name)
+        print(f"shadow 컬렉션 '{collection.name}'을 삭제하고 기존 컬렉션을 유지합니다.")
+        return None
 
     # 인덱스 생성
-    index_params = {
-        "metric_type": "IP",
-        "index_type": "HNSW",
-        "params": {"M": 8, "efConstruction": 200}
-    }
     collection.create_index(field_name="embedding", index_params=index_params)
-    utility.index_building_progress("movie_hereforus")
+    utility.index_building_progress(collection.name)
     
     print([index.params for index in collection.indexes])
     print("인덱스 생성이 완료되었습니다.")
     
     # 컬렉션 로드
     collection.load()
-    print(f"컬렉션 '{collection_name}'이 로드되었습니다.")
+    print(f"컬렉션 '{collection.name}'이 로드되었습니다.")
+
+    # 인덱스와 로드가 끝난 뒤 alias 전환 (무중단)
+    activate_collection(collection_name, collection)
+    return collection
+
+# 5. delta 반영 (신규 영화만 임베딩, 빠진 영화만 삭제)
+def sync_movie_collection(collection):
+    stored = {}
+    for row in iterate_rows(collection, ["id", "text"]):
+        stored.setdefault(row["text"], []).append(row["id"])
+
+    embedding_executor = get_embedding_executor()
+    chunked_text_list = chunked_movie_data(embedding_executor)
+    new_texts = [text for text in chunked_text_list if text not in stored]
+    expired_ids = [pk for text, ids in stored.items() if text not in chunked_text_list for pk in ids]
+
+    chunked_html = embedding_movie_data(new_texts) if new_texts else []
+    if chunked_html:
+        try:
+            collection.insert([[item['text'] for item in chunked_html], [item['embedding'] for item in chunked_html]])
+        except Exception as e:
+            print(f"데이터 Insertion 오류: {e}")
+
+    if expired_ids:
+        collection.delete(expr=f"id in {format_pk_list(expired_ids)}")
+
+    print(f"Delta 반영: 신규 {len(chunked_html)}, 삭제 {len(expired_ids)}")
     return collection
@@ -0,0 +1,182 @@
+import os
+import queue
+import threading
+import time
+from dataset.buffer import BufferPool
+from dataset.metrics import observe_indexing_stage
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_DONE = object()
+
+
+# 단계별 처리량 / 큐 적재량 통계 (job 이 있으면 Prometheus 지표에도 기록)
+class StageStats:
+    def __init__(self, name, job=None):
+        self.name = name
+        self.job = job
+        self.batches = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.queue_depth_total = 0
+        self.queue_depth_max = 0
+
+    def record(self, items, seconds, queue_depth):
+        self.batches += 1
+        self.items += items
+        self.busy_seconds += seconds
+        self.queue_depth_total += queue_depth
+        self.queue_depth_max = max(self.queue_depth_max, queue_depth)
+        if self.job is not None:
+            observe_indexing_stage(self.job, self.name, items, seconds)
+
+    def summary(self):
+        throughput = self.items / self.busy_seconds if self.busy_seconds else 0.0
+        avg_depth = self.queue_depth_total / self.batches if self.batches else 0.0
+        return (
+            f"[{self.name}] {self.batches} batches, {self.items} items, "
+            f"busy {self.busy_seconds:.1f}s, {throughput:.1f} items/s, "
+            f"queue avg {avg_depth:.1f} / max {self.queue_depth_max}"
+        )
+
+
+# fetch → embed → insert 단계를 bounded queue로 연결해 동시에 실행
+# - fetch_data(page, size): 기존 fetch_*_data 함수 (content / totalPages / error 형식)
+# - process_batch(page, content): 청크 생성 + (id, text, embedding[, columns]) iterator 반환
+# - insert_batch(page, entities): Milvus 삽입 (sub-batch 단위, [ids, texts, embeddings, scalar 컬럼...])
+# - job: 지표 라벨 (컬렉션 이름)
+# - start_page: 체크포인트에서 이어서 실행할 때 첫 페이지
+# - on_page_committed(page): 페이지의 마지막 sub-batch 까지 삽입된 뒤 호출 (체크포인트 저장)
+# 임베딩은 고정 개수의 float32 버퍼에 바로 기록하므로 메모리 사용량은 size와 무관
+def run_paging_pipeline(fetch_data, process_batch, insert_batch, size, on_fetch_error=None,
+                        queue_size=None, insert_batch_size=None, job=None, start_page=0,
+                        on_page_committed=None):
+    queue_size = queue_size or int(os.environ.get('PIPELINE_QUEUE_SIZE', 2))
+    insert_batch_size = insert_batch_size or int(os.environ.get('MILVUS_INSERT_BATCH_SIZE', 256))
+    fetched = queue.Queue(maxsize=queue_size)
+    embedded = queue.Queue(maxsize=queue_size)
+    # 채우는 중 1개 + 삽입 중 1개 + 큐 대기분
+    buffers = BufferPool(queue_size + 2, insert_batch_size)
+    stats = {name: StageStats(name, job) for name in ("fetch", "embed", "insert")}
+    stop = threading.Event()
+    errors = []
+
+    def put(q, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q):
+        while True:
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                if stop.is_set():
+                    return _DONE
+
+    def acquire_buffer():
+        while not stop.is_set():
+            buffer = buffers.acquire(timeout=0.5)
+            if buffer is not None:
+                return buffer
+        return None
+
+    def fetch_stage():
+        page = start_page
+        try:
+            while not stop.is_set():
+                started = time.time()
+                data = fetch_data(page, size)
+                if "error" in data or not data["content"]:
+                    print("No more data to process or an error occurred.")
+                    if "error" in data and on_fetch_error is not None:
+                        on_fetch_error()
+                    break
+
+                stats["fetch"].record(len(data["content"]), time.time() - started, fetched.qsize())
+                print(f"Fetched page {page + 1}, size: {size}")
+                if not put(fetched, (page, data["content"])):
+                    break
+                if page + 1 >= data["totalPages"]:
+                    break
+                page += 1
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            put(fetched, _DONE)
+
+    def embed_stage():
+        try:
+            while True:
+                item = get(fetched)
+                if item is _DONE:
+                    break
+                page, content = item
+                started = time.time()
+                count = 0
+                buffer = acquire_buffer()
+                for row in process_batch(page, content):
+                    if buffer is None:
+                        break
+                    buffer.append(*row)
+                    count += 1
+                    if buffer.is_full():
+                        if not put(embedded, (page, buffer, False)):
+                            buffer = None
+                            break
+                        buffer = acquire_buffer()
+                if buffer is None:
+                    break
+
+                # 페이지 마지막 sub-batch (비어 있어도 페이지 완료 신호로 전달)
+                stats["embed"].record(count, time.time() - started, embedded.qsize())
+                if not put(embedded, (page, buffer, True)):
+                    break
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            put(embedded, _DONE)
+
+    started = time.time()
+    workers = [
+        threading.Thread(target=fetch_stage, name="pipeline-fetch", daemon=True),
+        threading.Thread(target=embed_stage, name="pipeline-embed", daemon=True)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # insert 단계는 호출한 스레드에서 실행
+    try:
+        while True:
+            item = get(embedded)
+            if item is _DONE:
+                break
+            page, buffer, last = item
+            insert_started = time.time()
+            if buffer.size:
+                insert_batch(page, buffer.entities())
+            stats["insert"].record(buffer.size, time.time() - insert_started, embedded.qsize())
+            buffers.release(buffer)
+            if last and on_page_committed is not None:
+                on_page_committed(page)
+    except Exception as e:
+        errors.append(e)
+        stop.set()
+    finally:
+        for worker in workers:
+            worker.join()
+
+    print(f"파이프라인 완료: {time.time() - started:.1f}s")
+    for stage in stats.values():
+        print(stage.summary())
+
+    if errors:
+        raise errors[0]
+    return stats
@@ -0,0 +1,198 @@
+import os
+from pymilvus import Collection, FieldSchema, CollectionSchema, DataType, utility
+from dataset.columns import legacy_columns, scalar_fields
+from dataset.delta import format_pk_list, has_vector_index
+from dataset.district import DISTRICT_FIELD, DISTRICT_UNKNOWN
+from dataset.eventdate import END_DATE_UNKNOWN, OPEN_DATE_UNKNOWN, create_event_date_indexes
+from dataset.indexconfig import get_index_params
+from dataset.versioning import activate_collection, create_shadow_collection
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# festival / performance / food 를 하나로 합친 컬렉션 (category = 기존 컬렉션 이름, partition key)
+PLACES_COLLECTION = "places_hereforus"
+
+# 카테고리별 원본 id 타입 (places 에는 문자열로 저장)
+CATEGORY_ID_TYPES = {
+    "festival_hereforus": str,
+    "performance_hereforus": str,
+    "food_hereforus": int
+}
+
+# 필드 및 스키마 정의
+places_fields = [
+    FieldSchema(name="id", dtype=DataType.VARCHAR, max_length=320, is_primary=True),
+    FieldSchema(name="category", dtype=DataType.VARCHAR, max_length=64, is_partition_key=True),
+    FieldSchema(name="source_id", dtype=DataType.VARCHAR, max_length=256),
+    FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=9000),
+    FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1024),
+    # 행사 시작 / 종료 일자 (음식점은 항상 진행 중인 값)
+    FieldSchema(name="open_date", dtype=DataType.INT64),
+    FieldSchema(name="end_date", dtype=DataType.INT64),
+    # 음식점 자치구 (category 가 partition key 이므로 필터 검색)
+    FieldSchema(name="gu_name", dtype=DataType.VARCHAR, max_length=32)
+]
+
+
+# PLACES_LAYOUT=unified 이면 카테고리별 컬렉션 대신 places 컬렉션 사용
+def is_places_layout():
+    return os.environ.get('PLACES_LAYOUT', 'separate') == 'unified'
+
+
+def get_places_num_partitions():
+    return int(os.environ.get('PLACES_NUM_PARTITIONS', 16))
+
+
+# places 행 (스키마 필드 순서), columns: 카테고리 컬렉션의 scalar 필드 값 ({필드: 값 목록})
+# 카테고리에 없는 필드는 항상 진행 중인 일자 / 알 수 없는 자치구
+def places_entities(pks, categories, source_ids, texts, embeddings, columns):
+    return [
+        pks,
+        categories,
+        source_ids,
+        texts,
+        embeddings,
+        columns.get("open_date", [OPEN_DATE_UNKNOWN] * len(pks)),
+        columns.get("end_date", [END_DATE_UNKNOWN] * len(pks)),
+        columns.get(DISTRICT_FIELD, [DISTRICT_UNKNOWN] * len(pks))
+    ]
+
+
+# places 컬렉션 열기 (없으면 생성) 후 인덱스 생성 및 로드
+# 스키마가 바뀌었으면 새 버전 컬렉션으로 옮긴 뒤 alias 전환 (옮기는 동안 기존 컬렉션으로 계속 서비스)
+def setup_places_collection():
+    collection = Collection(PLACES_COLLECTION) if utility.has_collection(PLACES_COLLECTION) else None
+    if collection is not None:
+        stored_fields = [(field.name, field.dtype) for field in collection.schema.fields]
+        if stored_fields != [(field.name, field.dtype) for field in places_fields]:
+            print(f"컬렉션 '{PLACES_COLLECTION}'의 스키마가 변경되어 새 버전 컬렉션으로 옮깁니다.")
+            return migrate_places_collection(collection)
+
+    if collection is None:
+        schema = CollectionSchema(places_fields, description="sw_project")
+        collection = Collection(name=PLACES_COLLECTION, schema=schema, using='default', shards_num=2,
+                                num_partitions=get_places_num_partitions())
+        print(f"컬렉션 '{PLACES_COLLECTION}'이 생성되었습니다.")
+
+    if not has_vector_index(collection):
+        create_places_indexes(collection)
+    collection.load()
+    return collection
+
+
+def create_places_indexes(collection):
+    collection.create_index(field_name="embedding", index_params=get_index_params(PLACES_COLLECTION))
+    create_event_date_indexes(collection)
+
+
+# 기존 places 행을 새 스키마의 shadow 컬렉션에 복사 (임베딩은 다시 계산하지 않음)
+# 이전 스키마에는 일자 / 자치구 필드가 없으므로 저장된 text 에서 복원
+# 인덱스 생성과 로드가 끝난 뒤 alias 전환, 실패하면 shadow 를 삭제하고 기존 컬렉션 유지
+def migrate_places_collection(previous, batch_size=1000):
+    collection = create_shadow_collection(PLACES_COLLECTION, places_fields, get_places_num_partitions())
+    try:
+        previous.load()
+        iterator = previous.query_iterator(
+            batch_size=batch_size, output_fields=["id", "category", "source_id", "text", "embedding"]
+        )
+        copied = 0
+        try:
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    break
+                for category in {row["category"] for row in rows}:
+                    category_rows = [row for row in rows if row["category"] == category]
+                    texts = [row["text"] for row in category_rows]
+                    collection.insert(places_entities(
+                        [row["id"] for row in category_rows],
+                        [category] * len(category_rows),
+                        [row["source_id"] for row in category_rows],
+                        texts,
+                        [row["embedding"] for row in category_rows],
+                        legacy_columns(category, texts)
+                    ))
+                copied += len(rows)
+        finally:
+            iterator.close()
+        collection.flush()
+        print(f"'{previous.name}' → '{collection.name}' {copied}건 복사 완료")
+
+        create_places_indexes(collection)
+        collection.load()
+    except Exception:
+        utility.drop_collection(collection.name)
+        print(f"shadow 컬렉션 '{collection.name}'을 삭제하고 기존 컬렉션을 유지합니다.")
+        raise
+
+    activate_collection(PLACES_COLLECTION, collection)
+    return collection
+
+
+# places 컬렉션의 카테고리 하나를 기존 카테고리 컬렉션처럼 다루는 adapter
+# (DeltaSync, insert_page 에서 [ids, texts, embeddings, scalar 컬럼...] 형식 그대로 사용)
+class PlacesCategory:
+    def __init__(self, collection, category):
+        self.collection = collection
+        self.category = category
+        self.name = f"{collection.name}[{category}]"
+        self._id_type = CATEGORY_ID_TYPES.get(category, str)
+
+    def _pk(self, source_id):
+        return f"{self.category}:{source_id}"
+
+    def _expr(self):
+        return f'category == "{self.category}"'
+
+    def query_iterator(self, batch_size, output_fields):
+        fields = ["source_id" if field == "id" else field for field in output_fields]
+        return _PlacesRowIterator(
+            self.collection.query_iterator(batch_size=batch_size, expr=self._expr(), output_fields=fields),
+            self._id_type
+        )
+
+    def _entities(self, entities):
+        ids, texts, embeddings = entities[:3]
+        return places_entities(
+            [self._pk(pk) for pk in ids],
+            [self.category] * len(ids),
+            [str(pk) for pk in ids],
+            texts,
+            embeddings,
+            dict(zip(scalar_fields(self.category), entities[3:]))
+        )
+
+    def upsert(self, entities):
+        return self.collection.upsert(self._entities(entities))
+
+    def insert(self, entities):
+        return self.collection.upsert(self._entities(entities))
+
+    def delete_ids(self, ids):
+        return self.collection.delete(expr=f"id in {format_pk_list([self._pk(pk) for pk in ids])}")
+
+    @property
+    def indexes(self):
+        return self.collection.indexes
+
+
+class _PlacesRowIterator:
+    def __init__(self, iterator, id_type):
+        self._iterator = iterator
+        self._id_type = id_type
+
+    def next(self):
+        rows = []
+        for row in self._iterator.next():
+            row = dict(row)
+            row["id"] = self._id_type(row.pop("source_id"))
+            rows.append(row)
+        return rows
+
+    def close(self):
+        self._iterator.close()
+
+
+def open_places_category(category):
+    return PlacesCategory(setup_places_collection(), category)
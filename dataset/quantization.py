@@ -0,0 +1,97 @@
+import numpy as np
+
+# 지원 인코딩 (벡터당 바이트: float32 4*dim, float16 2*dim, int8 dim + 4(scale))
+ENCODINGS = ("float32", "float16", "int8")
+CODE_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+# 행렬 (n, dim) 양자화 → (codes, scales) / int8 외에는 scales=None
+def quantize(embeddings, encoding):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if encoding == "int8":
+        # 벡터별 scale = max|x| / 127
+        scales = np.abs(embeddings).max(axis=-1) / 127.0
+        scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+        codes = np.rint(embeddings / scales[..., None]).clip(-127, 127).astype(np.int8)
+        return codes, scales
+    return embeddings.astype(CODE_DTYPES[encoding]), None
+
+
+def dequantize(codes, scales, encoding):
+    if encoding == "int8":
+        return codes.astype(np.float32) * scales[..., None]
+    return codes.astype(np.float32)
+
+
+# 벡터 1개를 bytes 로 인코딩 (int8 은 앞 4바이트에 float32 scale)
+def encode_vector(vector, encoding):
+    codes, scales = quantize(vector, encoding)
+    if encoding == "int8":
+        return scales.tobytes() + codes.tobytes()
+    return codes.tobytes()
+
+
+def decode_vector(blob, encoding):
+    if encoding == "int8":
+        scale = np.frombuffer(blob[:4], dtype=np.float32)
+        codes = np.frombuffer(blob[4:], dtype=np.int8)
+        return dequantize(codes, scale, encoding).tolist()
+    return np.frombuffer(blob, dtype=CODE_DTYPES[encoding]).astype(np.float32).tolist()
+
+
+# 양자화된 행렬과 query 의 내적 (큰 행렬은 chunk 단위로 float32 변환)
+def quantized_scores(codes, scales, query, encoding, chunk_size=8192):
+    query = np.asarray(query, dtype=np.float32)
+    if encoding == "float32":
+        return codes @ query
+
+    scores = np.empty(len(codes), dtype=np.float32)
+    for start in range(0, len(codes), chunk_size):
+        block = codes[start:start + chunk_size].astype(np.float32)
+        scores[start:start + chunk_size] = block @ query
+    if encoding == "int8":
+        scores *= scales
+    return scores
+
+
+def top_k(scores, k):
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top])]
+
+
+# 스냅샷 임베딩에서 query 를 따로 떼어냄 (query 자신이 정답 1위가 되지 않도록)
+def split_queries(embeddings, num_queries=200, max_vectors=None, seed=0):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(embeddings))
+    num_queries = min(num_queries, len(embeddings) // 2)
+    base = order[num_queries:]
+    if max_vectors is not None:
+        base = base[:max_vectors]
+    return embeddings[np.sort(base)], embeddings[order[:num_queries]]
+
+
+# float32 스냅샷 기준 양자화 recall@k 비교 (저장된 실제 임베딩 일부를 검색 대상에서 빼서 query 로 사용)
+def recall_report(embeddings, k=10, num_queries=200, seed=0):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    base, queries = split_queries(embeddings, num_queries, seed=seed)
+    ground_truth = [set(top_k(base @ query, k).tolist()) for query in queries]
+
+    report = []
+    for encoding in ENCODINGS:
+        codes, scales = quantize(base, encoding)
+        hits = 0
+        for query, truth in zip(queries, ground_truth):
+            hits += len(truth & set(top_k(quantized_scores(codes, scales, query, encoding), k).tolist()))
+        bytes_per_vector = codes.itemsize * embeddings.shape[1] + (4 if scales is not None else 0)
+        report.append({
+            "encoding": encoding,
+            "bytes_per_vector": bytes_per_vector,
+            "total_mb": bytes_per_vector * len(embeddings) / 1024 / 1024,
+            f"recall@{k}": hits / (len(queries) * k)
+        })
+    return report
+
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# 429 응답 (Retry-After 헤더 포함)
+class RateLimitError(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__(f"Rate limit exceeded (Retry-After: {retry_after})")
+        self.retry_after = retry_after
+
+
+# Retry-After 헤더 → 대기 초 (초 단위 숫자 또는 HTTP-date, 해석할 수 없으면 None)
+def parse_retry_after(value):
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# 토큰 버킷: 초당 요청 수 제한 + 429 발생 시 감속 후 점진적 회복
+class TokenBucket:
+    def __init__(self, rate, capacity=None, min_rate=0.1):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    # 대기 중에 도착한 429 는 같은 과부하에 대한 응답이므로 대기 시간만 늘리고 감속은 대기 구간당 1회
+    def penalize(self, retry_after=None):
+        with self._lock:
+            now = time.monotonic()
+            delay = parse_retry_after(retry_after) or 1.0 / self.rate
+            if now >= self._blocked_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self._blocked_until = max(self._blocked_until, now + delay)
+            self._tokens = 0.0
+            self._updated = now
+
+    def reward(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.01)
+
+
+_embedding_rate_limiter = None
+_embedding_rate_limiter_lock = threading.Lock()
+
+
+def get_embedding_rate_limiter():
+    global _embedding_rate_limiter
+    with _embedding_rate_limiter_lock:
+        if _embedding_rate_limiter is None:
+            _embedding_rate_limiter = TokenBucket(
+                rate=float(os.environ.get('EMBEDDING_RPS', 5)),
+                capacity=float(os.environ.get('EMBEDDING_BURST', 0)) or None
+            )
+        return _embedding_rate_limiter
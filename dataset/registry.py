@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from pymilvus import connections, Collection, utility
+from dataset.places import PLACES_COLLECTION, is_places_layout
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# /course 에서 검색하는 컬렉션 (alias)
+SEARCH_COLLECTIONS = ["festival_hereforus", "performance_hereforus", "food_hereforus"]
+
+# 컬렉션별 데이터 버전 파일 (인덱서와 서버가 다른 프로세스여도 같은 값을 읽음)
+# 서버와 인덱서가 다른 호스트에서 실행되면 DATA_VERSION_DIR 을 공유 디렉터리로 지정
+_data_versions = {}
+_data_versions_lock = threading.Lock()
+
+
+def get_data_version_dir():
+    return os.environ.get('DATA_VERSION_DIR', '.cache/data_versions')
+
+
+def _data_version_path(collection_name):
+    return os.path.join(get_data_version_dir(), f"{collection_name}.version")
+
+
+# 인덱서가 컬렉션 갱신을 마치면 버전을 올려 캐시된 핸들과 응답 캐시를 갱신하게 함
+# 버전은 갱신 시각(ns)이므로 여러 인덱서가 동시에 올려도 이전 값과 겹치지 않음
+def bump_data_version(collection_name):
+    version = time.time_ns()
+    os.makedirs(get_data_version_dir(), exist_ok=True)
+    path = _data_version_path(collection_name)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(str(version))
+    os.replace(temp_path, path)
+    return version
+
+
+# 파일이 바뀐 경우에만 다시 읽음 (mtime 기준 캐시)
+def get_data_version(collection_name):
+    path = _data_version_path(collection_name)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+    with _data_versions_lock:
+        cached = _data_versions.get(collection_name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, encoding="utf-8") as f:
+                version = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return cached[1] if cached is not None else 0
+        _data_versions[collection_name] = (mtime, version)
+        return version
+
+
+# 검색 대상 컬렉션 전체의 데이터 버전 (응답 캐시 키에 사용)
+def get_data_stamp():
+    return tuple(
+        get_data_version(collection_name)
+        for collection_name in SEARCH_COLLECTIONS + [PLACES_COLLECTION]
+    )
+
+
+# 프로세스 전체에서 공유하는 로드된 Collection 핸들 캐시
+class CollectionRegistry:
+    def __init__(self, collection_names):
+        self._collection_names = collection_names
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def connect(self):
+        alias = os.environ.get('MILVUS_ALIAS')
+        if connections.has_connection(alias):
+            return
+        connections.connect(alias=alias,
+                            host=os.environ.get('MILVUS_HOST'),
+                            port=int(os.environ.get("MILVUS_PORT")))
+        print("Milvus에 성공적으로 연결되었습니다.")
+
+    # 서버 시작 시 모든 컬렉션을 미리 로드
+    def warm(self):
+        try:
+            self.connect()
+            for collection_name in self._collection_names:
+                self.get(collection_name)
+        except Exception as e:
+            print(f"컬렉션 사전 로드 오류: {e}")
+
+    def _load(self, collection_name):
+        self.connect()
+        if not utility.has_collection(collection_name):
+            print(f"컬렉션 '{collection_name}'이 존재하지 않습니다.")
+            return None
+        collection = Collection(collection_name)
+        collection.load()
+        print(f"컬렉션 '{collection_name}'이 로드되었습니다.")
+        return collection
+
+    # 다시 로드할 필요가 없으면 (True, 캐시된 핸들), 아니면 (False, None)
+    # Milvus 호출이 없으므로 이벤트 루프에서 바로 확인 가능
+    def lookup(self, collection_name):
+        version = get_data_version(collection_name)
+        entry = self._collections.get(collection_name)
+        if entry is not None and entry[0] == version:
+            return True, entry[1]
+        return False, None
+
+    # 인덱서가 새 버전을 알린 경우에만 다시 로드 (없으면 None)
+    def get(self, collection_name):
+        version = get_data_version(collection_name)
+        with self._lock:
+            entry = self._collections.get(collection_name)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            collection = self._load(collection_name)
+            self._collections[collection_name] = (version, collection)
+            return collection
+
+
+collection_registry = CollectionRegistry([PLACES_COLLECTION] if is_places_layout() else SEARCH_COLLECTIONS)
@@ -0,0 +1,158 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataset.columns import legacy_columns, scalar_fields
+from dataset.delta import text_fingerprint
+from dataset.embedding import iter_embeddings
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# 임베딩 / 삽입에 실패한 레코드 보관 (job 별, 다음 실행 시작 시 먼저 재시도)
+# id 는 타입(int / str)을 유지하도록 JSON 으로 저장, columns: 원본 항목의 scalar 필드 값 ({필드: 값} JSON)
+class RetryQueue:
+    def __init__(self, path, max_attempts=5):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS retry_queue ("
+            "job TEXT NOT NULL, id TEXT NOT NULL, text TEXT NOT NULL, error TEXT, "
+            "attempts INTEGER NOT NULL, updated REAL NOT NULL, columns TEXT, PRIMARY KEY (job, id))"
+        )
+        # 이전 버전 큐: scalar 필드 없이 저장된 레코드 (drain 시 text 에서 복원)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(retry_queue)")]
+        if "columns" not in columns:
+            self._conn.execute("ALTER TABLE retry_queue ADD COLUMN columns TEXT")
+        self._conn.commit()
+
+    # 실패 기록 (이미 있으면 시도 횟수 증가)
+    def add(self, job, pk, text, error, columns=None):
+        self.add_many(job, [pk], [text], error, [columns])
+
+    def add_many(self, job, pks, texts, error, columns=None):
+        columns = columns or [None] * len(pks)
+        rows = [
+            (job, json.dumps(pk), text, str(error), time.time(), json.dumps(values) if values is not None else None)
+            for pk, text, values in zip(pks, texts, columns)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO retry_queue (job, id, text, error, attempts, updated, columns) "
+                "VALUES (?, ?, ?, ?, 1, ?, ?) "
+                "ON CONFLICT (job, id) DO UPDATE SET text = excluded.text, error = excluded.error, "
+                "attempts = attempts + 1, updated = excluded.updated, "
+                "columns = COALESCE(excluded.columns, columns)",
+                rows
+            )
+            self._conn.commit()
+
+    # 재시도할 레코드 ({"id", "text", "columns"} 목록), 최대 시도 횟수를 넘은 항목은 폐기
+    def pending(self, job):
+        with self._lock:
+            dropped = self._conn.execute(
+                "DELETE FROM retry_queue WHERE job = ? AND attempts >= ?", (job, self._max_attempts)
+            ).rowcount
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT id, text, columns FROM retry_queue WHERE job = ? ORDER BY updated", (job,)
+            ).fetchall()
+        if dropped:
+            print(f"[{job}] 재시도 {self._max_attempts}회를 넘은 레코드 {dropped}건을 재시도 큐에서 제외했습니다.")
+        return [
+            {"id": json.loads(pk), "text": text, "columns": json.loads(columns) if columns is not None else None}
+            for pk, text, columns in rows
+        ]
+
+    def remove(self, job, pks):
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM retry_queue WHERE job = ? AND id = ?",
+                [(job, json.dumps(pk)) for pk in pks]
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT job, COUNT(*) FROM retry_queue GROUP BY job").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_retry_queue = None
+_retry_queue_lock = threading.Lock()
+
+
+def get_retry_queue():
+    global _retry_queue
+    with _retry_queue_lock:
+        if _retry_queue is None:
+            _retry_queue = RetryQueue(
+                path=os.environ.get('RETRY_QUEUE_PATH', '.cache/retry_queue.sqlite3'),
+                max_attempts=int(os.environ.get('RETRY_QUEUE_MAX_ATTEMPTS', 5))
+            )
+        return _retry_queue
+
+
+# 지난 실행에서 실패한 레코드를 이번 실행 시작 시 먼저 임베딩
+# - 임베딩은 캐시에 남으므로 원본에서 다시 받으면 API 호출 없이 처리됨
+# - delta 모드: 바로 upsert 하고 저장된 fingerprint 갱신 (원본에서 사라졌으면 만료 삭제 대상)
+# - collection: 이어서 실행하는 재구축처럼 지난 페이지를 다시 받지 않는 경우 바로 upsert
+# scalar 컬럼은 실패할 때 저장한 원본 항목 값 사용 (이전 버전 큐의 레코드만 text 에서 복원)
+# 반환값: 이번에 저장한 id 집합 (같은 id 가 다시 들어오면 insert 대신 upsert 해야 함)
+def drain_retry_queue(job, embedding_executor, delta_sync=None, collection=None, batch_size=None):
+    queue = get_retry_queue()
+    chunks = queue.pending(job)
+    if not chunks:
+        return set()
+
+    fields = scalar_fields(job)
+    for chunk in chunks:
+        if chunk["columns"] is None:
+            restored = legacy_columns(job, [chunk["text"]])
+            chunk["columns"] = {field: restored[field][0] for field in fields}
+    columns = {chunk["id"]: chunk["columns"] for chunk in chunks}
+
+    print(f"[{job}] 재시도 큐 {len(chunks)}건을 먼저 처리합니다.")
+    batch_size = batch_size or int(os.environ.get('MILVUS_INSERT_BATCH_SIZE', 256))
+    failed = []
+    embedded = list(iter_embeddings(
+        embedding_executor, chunks,
+        on_failure=lambda chunk, error: failed.append((chunk["id"], chunk["text"], error))
+    ))
+
+    written = set()
+    if delta_sync is not None or collection is not None:
+        for start in range(0, len(embedded), batch_size):
+            batch = embedded[start:start + batch_size]
+            entities = [[row[0] for row in batch], [row[1] for row in batch], [row[2] for row in batch]] + \
+                [[columns[row[0]][field] for row in batch] for field in fields]
+            try:
+                if delta_sync is not None:
+                    delta_sync.upsert(entities)
+                    for pk, text, _ in batch:
+                        delta_sync.stored[pk] = text_fingerprint(text)
+                else:
+                    collection.upsert(entities)
+                written.update(entities[0])
+            except Exception as e:
+                print(f"[{job}] 재시도 레코드 삽입 오류: {e}")
+                failed.extend((pk, text, e) for pk, text, _ in batch)
+
+    failed_ids = {pk for pk, _, _ in failed}
+    queue.remove(job, [pk for pk, _, _ in embedded if pk not in failed_ids])
+    for pk, text, error in failed:
+        queue.add(job, pk, text, error, columns[pk])
+    print(f"[{job}] 재시도 큐 처리: 성공 {len(chunks) - len(failed_ids)}, 실패 {len(failed_ids)}")
+    return written
@@ -0,0 +1,272 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from dataset.district import DISTRICT_COLLECTIONS, DISTRICT_FIELD, district_expr
+from dataset.eventdate import EVENT_COLLECTIONS, active_date_expr
+from dataset.indexconfig import get_search_params
+from dataset.registry import SEARCH_COLLECTIONS, collection_registry
+from dataset.places import CATEGORY_ID_TYPES, PLACES_COLLECTION, is_places_layout
+from dataset.snapshot import get_snapshot
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_search_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('SEARCH_MAX_WORKERS', 8)),
+    thread_name_prefix="search"
+)
+
+
+# SEARCH_ENGINE=numpy: 스냅샷 우선 (없으면 Milvus)
+# SEARCH_ENGINE=milvus: Milvus 우선 (컬렉션이 없거나 검색 실패 시 스냅샷)
+def get_search_engine():
+    return os.environ.get('SEARCH_ENGINE', 'milvus')
+
+
+# 행사 컬렉션은 기준 일자(YYYYMMDD)에 진행 중인 항목만 검색 (date 가 없으면 필터 없음)
+def _date_filter(collection_name, date):
+    return date if date is not None and collection_name in EVENT_COLLECTIONS else None
+
+
+# 음식점 컬렉션은 요청 지역의 자치구만 검색 (district 가 없으면 필터 없음)
+def _district_filter(collection_name, district):
+    return district if district is not None and collection_name in DISTRICT_COLLECTIONS else None
+
+
+# 필드가 추가되기 전 스키마로 아직 서비스 중인 컬렉션은 그 필터 없이 검색
+def _has_field(collection, field_name):
+    return any(field.name == field_name for field in collection.schema.fields)
+
+
+# 컬렉션 1개 검색 필터 (필터가 없으면 None)
+# gu_name 은 partition key 이므로 해당 자치구 partition 만 탐색
+def _filter_expr(collection_name, collection, date=None, district=None):
+    conditions = []
+    active_date = _date_filter(collection_name, date)
+    if active_date is not None and _has_field(collection, "open_date"):
+        conditions.append(active_date_expr(active_date))
+    active_district = _district_filter(collection_name, district)
+    if active_district is not None and _has_field(collection, DISTRICT_FIELD):
+        conditions.append(district_expr(active_district))
+    return " and ".join(conditions) or None
+
+
+# places 검색의 category 조건 뒤에 붙는 필터
+# 음식점은 항상 진행 중인 일자로, 행사는 자치구 없이 저장되므로 각 조건은 해당 카테고리에만 적용됨
+def _places_filter_expr(collection, date=None, district=None):
+    filter_expr = ""
+    if date is not None and _has_field(collection, "open_date"):
+        filter_expr += f" and {active_date_expr(date)}"
+    if district is not None and _has_field(collection, DISTRICT_FIELD):
+        categories = ", ".join(f'"{category}"' for category in DISTRICT_COLLECTIONS)
+        filter_expr += f" and (category not in [{categories}] or {district_expr(district)})"
+    return filter_expr
+
+
+# 요청 자치구에 결과가 없는 카테고리 (지역 조건 없이 다시 검색해 추천 후보가 비지 않도록 함)
+def _district_retry_categories(categories, results, district):
+    if district is None:
+        return []
+    found = {result["collection"] for result in results}
+    return [category for category in categories if category in DISTRICT_COLLECTIONS and category not in found]
+
+
+# memory-map 스냅샷 검색 (스냅샷이 없으면 None)
+def search_snapshot(collection_name, query_vector, limit=1, date=None, district=None):
+    snapshot = get_snapshot(collection_name)
+    if snapshot is None:
+        return None
+    results = _snapshot_hits(collection_name, snapshot, query_vector, limit, date, district)
+    if not results and _district_filter(collection_name, district) is not None:
+        results = _snapshot_hits(collection_name, snapshot, query_vector, limit, date, None)
+    return results
+
+
+def _snapshot_hits(collection_name, snapshot, query_vector, limit, date, district):
+    return [
+        {
+            "collection": collection_name,
+            "id": snapshot.ids[index],
+            "distance": score,
+            "text": snapshot.texts[index]
+        }
+        for index, score in snapshot.search(
+            query_vector, limit, _date_filter(collection_name, date), _district_filter(collection_name, district)
+        )
+    ]
+
+
+# 카테고리별 스냅샷만 검색 (Milvus 를 거치지 않음, 스냅샷이 없는 컬렉션은 결과에서 제외)
+def search_snapshots(query_vector, collection_names=None, limit=1, date=None, district=None):
+    aggregated_results = []
+    for name in collection_names or SEARCH_COLLECTIONS:
+        results = search_snapshot(name, query_vector, limit, date, district)
+        if results is None:
+            print(f"스냅샷 '{name}'이 없어 검색 결과에서 제외합니다.")
+            continue
+        aggregated_results.extend(results)
+    return aggregated_results
+
+
+# 컬렉션 1개 검색
+def search_collection(collection_name, query_vector, search_params=None, limit=1, timeout=None, date=None,
+                      district=None):
+    if get_search_engine() == "numpy":
+        results = search_snapshot(collection_name, query_vector, limit, date, district)
+        if results is not None:
+            return results
+        return search_milvus_collection(collection_name, query_vector, search_params, limit, timeout, date,
+                                        district) or []
+
+    try:
+        results = search_milvus_collection(collection_name, query_vector, search_params, limit, timeout, date, district)
+    except Exception as e:
+        results = search_snapshot(collection_name, query_vector, limit, date, district)
+        if results is None:
+            raise
+        print(f"컬렉션 '{collection_name}' 검색 오류, 스냅샷으로 대체합니다: {e}")
+        return results
+
+    if results is None:
+        results = search_snapshot(collection_name, query_vector, limit, date, district)
+    return results or []
+
+
+# Milvus 컬렉션 검색 (컬렉션이 없으면 None, search_params 가 없으면 컬렉션별 설정값)
+def search_milvus_collection(collection_name, query_vector, search_params=None, limit=1, timeout=None,
+                             date=None, district=None):
+    collection = collection_registry.get(collection_name)
+    if collection is None:
+        return None
+
+    def search(district):
+        results = collection.search(
+            data=[query_vector],
+            anns_field="embedding",
+            param=search_params or get_search_params(collection_name),
+            limit=limit,
+            expr=_filter_expr(collection_name, collection, date, district),
+            output_fields=["id", "text"],
+            timeout=timeout
+        )
+        return [_collection_hit(collection_name, hit) for hit in results[0]]
+
+    results = search(district)
+    if not results and _district_filter(collection_name, district) is not None:
+        results = search(None)
+    return results
+
+
+def _collection_hit(collection_name, hit):
+    return {
+        "collection": collection_name,  # 컬렉션 이름 추가
+        "id": hit.entity.get("id"),
+        "distance": hit.distance,
+        "text": hit.entity.get("text")
+    }
+
+
+# 여러 컬렉션을 동시에 검색하고 끝나는 순서대로 병합
+# 느리거나 실패한 컬렉션은 결과에서 제외 (다른 컬렉션을 기다리게 하지 않음)
+def search_collections(query_vector, search_params=None, collection_names=None, limit=1, timeout=None,
+                       date=None, district=None):
+    collection_names = collection_names or SEARCH_COLLECTIONS
+    timeout = timeout or float(os.environ.get('SEARCH_TIMEOUT', 2.0))
+
+    futures = {
+        _search_executor.submit(search_collection, name, query_vector, search_params, limit, timeout, date,
+                                district): name
+        for name in collection_names
+    }
+
+    aggregated_results = []
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            try:
+                aggregated_results.extend(future.result())
+            except Exception as e:
+                print(f"컬렉션 '{futures[future]}' 검색 오류: {e}")
+    except TimeoutError:
+        for future, name in futures.items():
+            if not future.done():
+                future.cancel()
+                print(f"컬렉션 '{name}' 검색 시간 초과 ({timeout}s)")
+
+    return aggregated_results
+
+
+def _places_hit(hit):
+    category = hit.entity.get("category")
+    return {
+        "collection": category,
+        "id": CATEGORY_ID_TYPES.get(category, str)(hit.entity.get("source_id")),
+        "distance": hit.distance,
+        "text": hit.entity.get("text")
+    }
+
+
+# 통합 places 컬렉션 검색
+# - limit=1: category 기준 grouping search 1회로 카테고리별 top-1 반환
+# - limit>1: 카테고리별 partition key 필터 검색 (해당 partition 만 탐색)
+def search_places(query_vector, search_params=None, categories=None, limit=1, timeout=None, date=None, district=None):
+    categories = categories or SEARCH_COLLECTIONS
+    timeout = timeout or float(os.environ.get('SEARCH_TIMEOUT', 2.0))
+    collection = collection_registry.get(PLACES_COLLECTION)
+    if collection is None:
+        return []
+    search_params = search_params or get_search_params(PLACES_COLLECTION)
+
+    category_list = ", ".join(f'"{category}"' for category in categories)
+    filter_expr = _places_filter_expr(collection, date, district)
+
+    def search_category(category, filter_expr=filter_expr):
+        results = collection.search(
+            data=[query_vector],
+            anns_field="embedding",
+            param=search_params,
+            limit=limit,
+            expr=f'category == "{category}"{filter_expr}',
+            output_fields=["category", "source_id", "text"],
+            timeout=timeout
+        )
+        return [_places_hit(hit) for hit in results[0]]
+
+    # 요청 자치구에 결과가 없는 카테고리는 지역 조건 없이 다시 검색
+    def retry_without_district(results):
+        for category in _district_retry_categories(categories, results, district):
+            results.extend(search_category(category, _places_filter_expr(collection, date)))
+        return results
+
+    if limit == 1:
+        results = collection.search(
+            data=[query_vector],
+            anns_field="embedding",
+            param=search_params,
+            limit=len(categories),
+            expr=f"category in [{category_list}]{filter_expr}",
+            output_fields=["category", "source_id", "text"],
+            group_by_field="category",
+            timeout=timeout
+        )
+        return retry_without_district([_places_hit(hit) for hit in results[0]])
+
+    aggregated_results = []
+    for results in _search_executor.map(search_category, categories, timeout=timeout):
+        aggregated_results.extend(results)
+    return retry_without_district(aggregated_results)
+
+
+# 레이아웃에 맞는 검색 경로 선택
+def search_all(query_vector, search_params=None, limit=1, timeout=None, date=None, district=None):
+    if is_places_layout():
+        # 카테고리별 스냅샷이 모두 있으면 NumPy 검색
+        if get_search_engine() == "numpy" and all(get_snapshot(name) for name in SEARCH_COLLECTIONS):
+            return search_collections(query_vector, search_params, limit=limit, timeout=timeout, date=date,
+                                      district=district)
+        try:
+            return search_places(query_vector, search_params, limit=limit, timeout=timeout, date=date,
+                                 district=district)
+        except Exception as e:
+            # 통합 레이아웃에서는 카테고리별 컬렉션이 갱신되지 않으므로 스냅샷으로만 대체
+            print(f"컬렉션 '{PLACES_COLLECTION}' 검색 오류, 스냅샷으로 대체합니다: {e}")
+            return search_snapshots(query_vector, limit=limit, date=date, district=district)
+    return search_collections(query_vector, search_params, limit=limit, timeout=timeout, date=date, district=district)
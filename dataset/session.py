@@ -0,0 +1,41 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+# 프로세스 전체에서 공유하는 keep-alive HTTP 세션 (호스트별 커넥션 풀)
+# 풀이 모두 사용 중이면 기다리지 않고 임시 커넥션을 열어 사용 (SSE 스트림이 커넥션을 오래 잡고 있어도 요청이 멈추지 않음)
+# HTTP_POOL_SIZE 는 재사용을 위해 보관하는 커넥션 수
+def get_http_session():
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            pool_size = int(os.environ.get('HTTP_POOL_SIZE', 16))
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=False)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+# 요청 timeout (connect, read)
+def get_http_timeout():
+    return (
+        float(os.environ.get('HTTP_CONNECT_TIMEOUT', 5)),
+        float(os.environ.get('HTTP_READ_TIMEOUT', 60))
+    )
+
+
+# 'host' 또는 'https://host' 형식 모두 허용
+def base_url(host):
+    if host.startswith("http://") or host.startswith("https://"):
+        return host.rstrip("/")
+    return f"https://{host}"
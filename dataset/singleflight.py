@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# 같은 키의 동시 요청은 먼저 들어온 1건만 실행하고 나머지는 그 결과를 공유
+# (캐시와 달리 결과를 보관하지 않음, 실행 중인 동안만 합침)
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        # 통계
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "shared": self.shared
+            }
+
+
+# SingleFlight 의 asyncio 버전
+# 실행은 별도 task 로 하므로 먼저 온 요청이 끊겨도 기다리는 요청은 결과를 받음
+class AsyncSingleFlight:
+    def __init__(self):
+        self._tasks = {}
+
+        # 통계
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key, fn):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            self.executed += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {
+            "in_flight": len(self._tasks),
+            "executed": self.executed,
+            "shared": self.shared
+        }
+
+
+_course_flight = SingleFlight()
+
+
+# /course 요청 합치기 (키: 정규화된 키워드 + 데이터 버전)
+def get_course_flight():
+    return _course_flight
@@ -0,0 +1,151 @@
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+import numpy as np
+from dataset.buffer import EMBEDDING_DIM
+from dataset.columns import legacy_columns, scalar_fields
+from dataset.delta import iterate_rows
+from dataset.district import DISTRICT_FIELD, district_mask
+from dataset.eventdate import active_date_mask
+from dataset.quantization import CODE_DTYPES, dequantize, quantize, quantized_scores, top_k
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def get_snapshot_dir():
+    return os.environ.get('SNAPSHOT_DIR', '.cache/snapshots')
+
+
+# 인덱서 종료 시 스냅샷 내보내기 여부
+def is_snapshot_export_enabled():
+    return os.environ.get('SNAPSHOT_EXPORT', 'false').lower() == 'true'
+
+
+# 컬렉션 전체를 스냅샷으로 내보내기 (SNAPSHOT_ENCODING: float32 / float16 / int8)
+# <SNAPSHOT_DIR>/<name>/<version>/{embeddings.<encoding>, scales.float32, meta.json} 작성 후
+# CURRENT 파일을 원자적으로 교체 (일자 / 자치구 필터용 scalar 필드는 meta.json 의 columns)
+def export_snapshot(collection, name, keep=1, encoding=None):
+    encoding = encoding or os.environ.get('SNAPSHOT_ENCODING', 'float32')
+    root = os.path.join(get_snapshot_dir(), name)
+    version = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    directory = os.path.join(root, version)
+    os.makedirs(directory, exist_ok=True)
+
+    fields = scalar_fields(name)
+    ids = []
+    texts = []
+    columns = {field: [] for field in fields}
+    with open(os.path.join(directory, f"embeddings.{encoding}"), "wb") as f, \
+            open(os.path.join(directory, "scales.float32"), "wb") as scales_file:
+        for row in iterate_rows(collection, ["id", "text", "embedding", *fields]):
+            ids.append(row["id"])
+            texts.append(row["text"])
+            for field in fields:
+                columns[field].append(row[field])
+            codes, scales = quantize(row["embedding"], encoding)
+            f.write(codes.tobytes())
+            if scales is not None:
+                scales_file.write(scales.tobytes())
+
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"count": len(ids), "dim": EMBEDDING_DIM, "encoding": encoding, "ids": ids, "texts": texts,
+                   "columns": columns}, f, ensure_ascii=False)
+
+    pointer = os.path.join(root, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    print(f"스냅샷 '{name}' ({len(ids)}건) 내보내기 완료: {directory}")
+
+    # 사용 중인 worker 가 있을 수 있으므로 직전 버전은 남겨둠
+    versions = sorted(entry for entry in os.listdir(root) if entry.isdigit())
+    for old in versions[:-(keep + 1)]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return directory
+
+
+# memory-map 한 스냅샷에서 brute-force 내적 검색
+class SnapshotIndex:
+    def __init__(self, directory):
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.ids = meta["ids"]
+        self.texts = meta["texts"]
+        self.encoding = meta.get("encoding", "float32")
+        self.name = os.path.basename(os.path.dirname(os.path.normpath(directory)))
+        self._columns = meta.get("columns")
+        self._event_dates = None
+        self._districts = None
+        count = meta["count"]
+        dtype = CODE_DTYPES[self.encoding]
+        self.scales = None
+        if count:
+            self.embeddings = np.memmap(os.path.join(directory, f"embeddings.{self.encoding}"), dtype=dtype,
+                                        mode="r", shape=(count, meta["dim"]))
+            if self.encoding == "int8":
+                self.scales = np.memmap(os.path.join(directory, "scales.float32"), dtype=np.float32,
+                                        mode="r", shape=(count,))
+        else:
+            self.embeddings = np.empty((0, meta["dim"]), dtype=dtype)
+            self.scales = np.empty((0,), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # float32 로 복원한 전체 행렬
+    def vectors(self):
+        return dequantize(self.embeddings, self.scales, self.encoding)
+
+    # meta.json 의 scalar 컬럼 (columns 가 없는 이전 스냅샷은 처음 사용할 때 text 에서 1회 복원)
+    def column(self, field):
+        if self._columns is None:
+            self._columns = legacy_columns(self.name, self.texts)
+        return self._columns[field]
+
+    # 기준 일자(YYYYMMDD)에 진행 중인 행
+    def active_mask(self, date):
+        if self._event_dates is None:
+            self._event_dates = (np.asarray(self.column("open_date")), np.asarray(self.column("end_date")))
+        return active_date_mask(*self._event_dates, date)
+
+    # 자치구가 같은 행
+    def district_mask(self, district):
+        if self._districts is None:
+            self._districts = np.asarray(self.column(DISTRICT_FIELD))
+        return district_mask(self._districts, district)
+
+    # (index, score) 상위 limit 개를 점수 내림차순으로 반환 (date: 진행 중인 행사만, district: 해당 자치구만)
+    def search(self, query_vector, limit=1, date=None, district=None):
+        if not len(self):
+            return []
+        scores = quantized_scores(self.embeddings, self.scales, query_vector, self.encoding)
+        if date is not None:
+            scores = np.where(self.active_mask(date), scores, -np.inf)
+        if district is not None:
+            scores = np.where(self.district_mask(district), scores, -np.inf)
+        return [(int(index), float(scores[index])) for index in top_k(scores, limit) if scores[index] > -np.inf]
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+# CURRENT 가 바뀌었을 때만 다시 여는 프로세스 전체 스냅샷 캐시 (없으면 None)
+def get_snapshot(name):
+    pointer = os.path.join(get_snapshot_dir(), name, "CURRENT")
+    try:
+        with open(pointer) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+
+    with _snapshots_lock:
+        entry = _snapshots.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        snapshot = SnapshotIndex(os.path.join(get_snapshot_dir(), name, version))
+        _snapshots[name] = (version, snapshot)
+        return snapshot
@@ -0,0 +1,140 @@
+import os
+import time
+from datetime import datetime
+import numpy as np
+from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, utility
+from dataset.indexconfig import DEFAULT_INDEX_PARAMS, DEFAULT_SEARCH_PARAMS
+from dataset.quantization import split_queries, top_k
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# HNSW 파라미터 측정용 임시 컬렉션 이름 접두사 (측정이 끝나면 삭제)
+SWEEP_PREFIX = "hnsw_sweep_"
+
+
+# NumPy 전수 내적으로 계산한 query 별 정답 top-k (base 행 번호)
+def exact_ground_truth(base, queries, k=10, chunk_size=256):
+    ground_truth = []
+    for start in range(0, len(queries), chunk_size):
+        scores = queries[start:start + chunk_size] @ base.T
+        ground_truth.extend(top_k(row, k).tolist() for row in scores)
+    return ground_truth
+
+
+def recall_at_k(results, ground_truth, k):
+    hits = sum(len(set(found[:k]) & set(truth[:k])) for found, truth in zip(results, ground_truth))
+    return hits / (len(ground_truth) * k)
+
+
+# HNSW 메모리 추정치 (float32 벡터 + layer 0 이웃 2M개 + 상위 layer 이웃 평균 M/(M-1)개, id 4바이트)
+def estimate_hnsw_memory(count, dim, m):
+    return int(count * (4 * dim + 4 * 2 * m + 4 * m / max(m - 1, 1)))
+
+
+def _sweep_collection(base, index):
+    name = f"{SWEEP_PREFIX}{index}"
+    if utility.has_collection(name):
+        utility.drop_collection(name)
+    fields = [
+        FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=base.shape[1])
+    ]
+    collection = Collection(name=name, schema=CollectionSchema(fields, description="hnsw sweep"))
+    batch_size = int(os.environ.get('MILVUS_INSERT_BATCH_SIZE', 256))
+    for start in range(0, len(base), batch_size):
+        collection.insert([list(range(start, min(start + batch_size, len(base)))), base[start:start + batch_size]])
+    collection.flush()
+    return collection
+
+
+# 로드된 segment 메모리 합계 (서버가 알려주지 않으면 None)
+def _loaded_memory(collection_name):
+    try:
+        return sum(segment.mem_size for segment in utility.get_query_segment_info(collection_name))
+    except Exception:
+        return None
+
+
+# M / efConstruction 조합마다 임시 컬렉션에 인덱스를 만들고 ef 별 recall / 지연 측정
+# 반환값: 측정 결과 행 목록 (M, efConstruction, ef, recall, p50_ms, p99_ms, build_seconds, memory_bytes, ...)
+def sweep_hnsw(base, queries, ground_truth, ms, ef_constructions, efs, k=10, warmup=10):
+    metric_type = DEFAULT_INDEX_PARAMS["metric_type"]
+    efs = sorted(ef for ef in efs if ef >= k)
+    rows = []
+    for index, (m, ef_construction) in enumerate((m, efc) for m in ms for efc in ef_constructions):
+        collection = _sweep_collection(base, index)
+        try:
+            started = time.perf_counter()
+            collection.create_index(field_name="embedding", index_params={
+                "metric_type": metric_type, "index_type": "HNSW",
+                "params": {"M": m, "efConstruction": ef_construction}
+            })
+            utility.wait_for_index_building_complete(collection.name)
+            build_seconds = time.perf_counter() - started
+            collection.load()
+            memory_bytes = _loaded_memory(collection.name)
+
+            for ef in efs:
+                search_params = {"metric_type": metric_type, "params": {"ef": ef}}
+                for query in queries[:warmup]:
+                    collection.search(data=[query], anns_field="embedding", param=search_params, limit=k)
+
+                latencies = []
+                results = []
+                for query in queries:
+                    started = time.perf_counter()
+                    hits = collection.search(data=[query], anns_field="embedding", param=search_params, limit=k)
+                    latencies.append(time.perf_counter() - started)
+                    results.append([hit.id for hit in hits[0]])
+
+                rows.append({
+                    "M": m,
+                    "efConstruction": ef_construction,
+                    "ef": ef,
+                    "recall": recall_at_k(results, ground_truth, k),
+                    "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+                    "p99_ms": float(np.percentile(latencies, 99)) * 1000,
+                    "build_seconds": build_seconds,
+                    "memory_bytes": memory_bytes,
+                    "estimated_memory_bytes": estimate_hnsw_memory(len(base), base.shape[1], m)
+                })
+                print(format_sweep_row(rows[-1], k))
+        finally:
+            collection.release()
+            utility.drop_collection(collection.name)
+    return rows
+
+
+def format_sweep_row(row, k):
+    memory = row["memory_bytes"] if row["memory_bytes"] is not None else row["estimated_memory_bytes"]
+    return (
+        f"M={row['M']:>3} efC={row['efConstruction']:>4} ef={row['ef']:>4}  "
+        f"recall@{k}={row['recall']:.4f}  p50={row['p50_ms']:6.2f}ms  p99={row['p99_ms']:6.2f}ms  "
+        f"build={row['build_seconds']:6.1f}s  mem={memory / 1024 / 1024:7.1f}MB"
+    )
+
+
+# 목표 recall 을 넘는 조합 중 p99 지연 → 메모리 → 빌드 시간 순으로 가장 작은 조합
+# 목표를 넘는 조합이 없으면 recall 이 가장 높은 조합
+def choose_params(rows, target_recall=0.95):
+    passing = [row for row in rows if row["recall"] >= target_recall]
+    if not passing:
+        return max(rows, key=lambda row: (row["recall"], -row["p99_ms"]))
+    return min(passing, key=lambda row: (
+        row["p99_ms"],
+        row["memory_bytes"] if row["memory_bytes"] is not None else row["estimated_memory_bytes"],
+        row["build_seconds"]
+    ))
+
+
+# index_config.json 의 컬렉션 항목
+def config_entry(row, k, target_recall, num_vectors, num_queries):
+    index_params = dict(DEFAULT_INDEX_PARAMS, params={"M": row["M"], "efConstruction": row["efConstruction"]})
+    search_params = dict(DEFAULT_SEARCH_PARAMS, params={"ef": row["ef"]})
+    return {
+        "index_params": index_params,
+        "search_params": search_params,
+        "measured": dict(row, k=k, target_recall=target_recall, vectors=num_vectors, queries=num_queries,
+                         measured_at=datetime.now().isoformat(timespec="seconds"))
+    }
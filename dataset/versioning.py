@@ -0,0 +1,81 @@
+import os
+from datetime import datetime
+from pymilvus import Collection, CollectionSchema, utility
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# 서비스는 alias(기존 컬렉션 이름)로 접근하고, 실제 데이터는 버전 컬렉션에 저장
+def versioned_name(alias):
+    return f"{alias}_v{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+
+def list_versions(alias):
+    prefix = f"{alias}_v"
+    return sorted(
+        name for name in utility.list_collections()
+        if name.startswith(prefix) and name[len(prefix):].isdigit()
+    )
+
+
+# alias가 현재 가리키는 버전 컬렉션 이름
+def resolve_alias(alias):
+    for name in list_versions(alias):
+        if alias in utility.list_aliases(name):
+            return name
+    return None
+
+
+# 새 버전(shadow) 컬렉션 생성 (num_partitions: partition key 필드가 있을 때만)
+def create_shadow_collection(alias, fields, num_partitions=None):
+    collection_name = versioned_name(alias)
+    schema = CollectionSchema(fields, description="sw_project")
+    options = {"num_partitions": num_partitions} if num_partitions else {}
+    collection = Collection(name=collection_name, schema=schema, using='default', shards_num=2, **options)
+    print(f"shadow 컬렉션 '{collection_name}'이 생성되었습니다.")
+    return collection
+
+
+# 인덱스 생성 및 로드가 끝난 컬렉션으로 alias 전환
+def activate_collection(alias, collection):
+    previous = resolve_alias(alias)
+
+    # 최초 1회: alias와 같은 이름의 기존 (버전 없는) 컬렉션을 alias로 교체
+    if alias in utility.list_collections():
+        utility.drop_collection(alias)
+        print(f"기존 컬렉션 '{alias}'을 삭제하고 alias로 전환합니다.")
+
+    if previous is None:
+        utility.create_alias(collection.name, alias)
+    else:
+        utility.alter_alias(collection.name, alias)
+    print(f"alias '{alias}' → '{collection.name}' 전환 완료 (이전: {previous})")
+
+    drop_old_versions(alias, active=collection.name)
+
+
+# 활성 버전과 직전 버전 몇 개만 남기고 삭제
+# 남겨 둔 직전 버전은 alias 뒤에 있지 않으므로 release 해서 query node 메모리를 비움
+def drop_old_versions(alias, active, keep=None):
+    keep = int(os.environ.get('MILVUS_VERSIONS_TO_KEEP', 1)) if keep is None else keep
+    versions = list_versions(alias)
+    older = [name for name in versions if name < active]
+    retained = set(older[-keep:]) if keep > 0 else set()
+
+    for name in versions:
+        if name == active:
+            continue
+        if name in retained:
+            try:
+                Collection(name).release()
+                print(f"이전 버전 컬렉션 '{name}'을 release 했습니다.")
+            except Exception as e:
+                print(f"이전 버전 컬렉션 '{name}' release 오류: {e}")
+            continue
+        try:
+            Collection(name).release()
+            utility.drop_collection(name)
+            print(f"이전 버전 컬렉션 '{name}'을 삭제했습니다.")
+        except Exception as e:
+            print(f"이전 버전 컬렉션 '{name}' 삭제 오류: {e}")
@@ -0,0 +1,335 @@
+import ast
+import json
+import multiprocessing
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from urllib.request import Request, urlopen
+import numpy as np
+from dataset.buffer import EMBEDDING_DIM
+
+# 벤치마크용 로컬 대역 (원본 API 서버, Clova 임베딩 API, 메모리 벡터 저장소)
+
+
+# 원본 데이터 항목 (food: int id, 나머지: 문자열 id)
+def make_item(kind, index, revision=0):
+    if kind == "food":
+        return {
+            "id": index,
+            "majorCategory": ["한식", "중식", "일식", "양식"][index % 4],
+            "title": f"음식점 {index}",
+            "phoneNumber": f"02-000-{index:04d}",
+            "guName": ["강남구", "마포구", "종로구", "송파구"][index % 4],
+            "address": f"서울 어딘가 {index}번지 (rev {revision})"
+        }
+    return {
+        "id": f"{kind}-{index}",
+        "category": ["음악", "연극", "전시", "축제"][index % 4],
+        "title": f"{kind} {index}",
+        "place": f"장소 {index % 50}",
+        "openDate": "2024-01-01",
+        "endDate": "2024-12-31",
+        "useAge": f"전체 (rev {revision})"
+    }
+
+
+# 텍스트마다 고정된 단위 벡터 (같은 텍스트 → 같은 임베딩)
+def fake_embedding(text):
+    rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+    vector = rng.standard_normal(EMBEDDING_DIM).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+# GET /<kind>?page=&size= : 원본 API 페이징 응답
+# POST /embedding          : Clova 임베딩 API (지연 + 일정 비율 429)
+# 측정 대상 프로세스와 GIL 을 나눠 쓰지 않도록 별도 프로세스에서 실행 (Linux fork)
+class FakeServer:
+    def __init__(self, items=2000, source_latency=0.05, embed_latency=0.02,
+                 rate_429=0.0, retry_after=0.2, changed_ratio=0.0, seed=0):
+        self.items = items
+        self.source_latency = source_latency
+        self.embed_latency = embed_latency
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.changed_ratio = changed_ratio
+        self.revision = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # 통계
+        self.source_requests = 0
+        self.embed_requests = 0
+        self.rate_limited = 0
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._process = multiprocessing.get_context("fork").Process(
+            target=self._server.serve_forever, name="bench-server", daemon=True
+        )
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._process.start()
+        return self
+
+    def stop(self):
+        self._process.terminate()
+        self._process.join()
+        self._server.server_close()
+
+    # 서버 프로세스의 요청 통계
+    def stats(self):
+        with urlopen(f"{self.url}/_stats") as response:
+            return json.loads(response.read())
+
+    # 다음 실행에서 changed_ratio 만큼의 항목 내용이 바뀜 (delta 측정용)
+    def next_revision(self):
+        urlopen(Request(f"{self.url}/_revision", data=b"{}", method="POST")).close()
+
+    def _revision_of(self, index):
+        if self.revision and zlib.crc32(f"{index}:{self.revision}".encode()) % 1000 < self.changed_ratio * 1000:
+            return self.revision
+        return 0
+
+    def _page(self, kind, page, size):
+        time.sleep(self.source_latency)
+        with self._lock:
+            self.source_requests += 1
+        start = page * size
+        content = [make_item(kind, index, self._revision_of(index))
+                   for index in range(start, min(start + size, self.items))]
+        return {"content": content, "totalPages": (self.items + size - 1) // size}
+
+    def _embed(self, text):
+        time.sleep(self.embed_latency)
+        with self._lock:
+            self.embed_requests += 1
+            limited = self._random.random() < self.rate_429
+            if limited:
+                self.rate_limited += 1
+        if limited:
+            return 429, None
+        return 200, {"status": {"code": "20000"}, "result": {"embedding": fake_embedding(text)}}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                kind = parsed.path.strip("/")
+                if kind == "_stats":
+                    with server._lock:
+                        self._send(200, {
+                            "source_requests": server.source_requests,
+                            "embed_requests": server.embed_requests,
+                            "rate_limited": server.rate_limited
+                        })
+                    return
+                page = int(query.get("page", ["0"])[0])
+                size = int(query.get("size", ["100"])[0])
+                self._send(200, server._page(kind, page, size))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/_revision":
+                    server.revision += 1
+                    self._send(200, {"revision": server.revision})
+                    return
+                status, payload = server._embed(request.get("text", ""))
+                if status == 429:
+                    self._send(429, {"status": {"code": "42901"}}, {"Retry-After": str(server.retry_after)})
+                else:
+                    self._send(status, payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class _Index:
+    def __init__(self, field_name, params):
+        self.field_name = field_name
+        self.params = params
+
+
+# pymilvus Collection 의 인덱서가 사용하는 부분만 구현한 메모리 컬렉션
+# insert / upsert 시 벡터를 복사 (pipeline 버퍼는 재사용되므로)
+class MemoryCollection:
+    def __init__(self, store, name, schema):
+        self._store = store
+        self.name = name
+        self.schema = schema
+        self._rows = {}
+        self._indexes = []
+        self._lock = threading.Lock()
+
+    # open_date / end_date 같은 scalar 컬럼은 저장하지 않음
+    def insert(self, entities, **kwargs):
+        ids, texts, embeddings = entities[:3]
+        embeddings = np.array(embeddings, dtype=np.float32)
+        with self._lock:
+            for pk, text, embedding in zip(ids, texts, embeddings):
+                self._rows[pk] = (text, embedding)
+
+    def upsert(self, entities, **kwargs):
+        self.insert(entities)
+
+    def delete(self, expr, **kwargs):
+        match = re.fullmatch(r"\s*id\s+in\s+(\[.*\])\s*", expr, re.S)
+        if match is None:
+            raise ValueError(f"지원하지 않는 expr: {expr}")
+        with self._lock:
+            for pk in ast.literal_eval(match.group(1)):
+                self._rows.pop(pk, None)
+
+    def query_iterator(self, batch_size=1000, output_fields=None, expr=None, **kwargs):
+        output_fields = output_fields or ["id"]
+        with self._lock:
+            rows = [
+                {key: value for key, value in (("id", pk), ("text", text), ("embedding", embedding))
+                 if key in output_fields}
+                for pk, (text, embedding) in self._rows.items()
+            ]
+        return _MemoryIterator(rows, batch_size)
+
+    def create_index(self, field_name, index_params=None, **kwargs):
+        self._indexes.append(_Index(field_name, index_params))
+
+    def has_index(self, **kwargs):
+        return bool(self._indexes)
+
+    @property
+    def indexes(self):
+        return list(self._indexes)
+
+    def load(self, **kwargs):
+        pass
+
+    def release(self, **kwargs):
+        pass
+
+    def flush(self, **kwargs):
+        pass
+
+    @property
+    def num_entities(self):
+        return len(self._rows)
+
+
+class _MemoryIterator:
+    def __init__(self, rows, batch_size):
+        self._rows = rows
+        self._batch_size = batch_size
+        self._offset = 0
+
+    def next(self):
+        rows = self._rows[self._offset:self._offset + self._batch_size]
+        self._offset += len(rows)
+        return rows
+
+    def close(self):
+        pass
+
+
+# pymilvus connections / utility / Collection 대역 (alias 포함)
+class MemoryStore:
+    def __init__(self):
+        self.collections = {}
+        self.aliases = {}
+        self.utility = _MemoryUtility(self)
+        self.connections = _MemoryConnections()
+
+    def resolve(self, name):
+        return self.aliases.get(name, name)
+
+    # Collection(name) / Collection(name=..., schema=...) 호출 대역
+    def Collection(self, name, schema=None, **kwargs):
+        name = self.resolve(name)
+        if name not in self.collections:
+            if schema is None:
+                raise ValueError(f"컬렉션 '{name}'이 존재하지 않습니다.")
+            self.collections[name] = MemoryCollection(self, name, schema)
+        return self.collections[name]
+
+
+class _MemoryUtility:
+    def __init__(self, store):
+        self._store = store
+
+    def has_collection(self, name, **kwargs):
+        return self._store.resolve(name) in self._store.collections
+
+    def list_collections(self, **kwargs):
+        return list(self._store.collections)
+
+    def list_aliases(self, name, **kwargs):
+        return [alias for alias, target in self._store.aliases.items() if target == name]
+
+    def create_alias(self, name, alias, **kwargs):
+        self._store.aliases[alias] = name
+
+    def alter_alias(self, name, alias, **kwargs):
+        self._store.aliases[alias] = name
+
+    def drop_collection(self, name, **kwargs):
+        self._store.collections.pop(name, None)
+        for alias in self.list_aliases(name):
+            del self._store.aliases[alias]
+
+
+class _MemoryConnections:
+    def connect(self, *args, **kwargs):
+        pass
+
+    def disconnect(self, *args, **kwargs):
+        pass
+
+    def has_connection(self, *args, **kwargs):
+        return True
+
+
+# dataset 모듈이 import 한 pymilvus 이름을 메모리 저장소로 교체
+@contextmanager
+def memory_milvus(store=None):
+    store = store or MemoryStore()
+    replacements = {"Collection": store.Collection, "utility": store.utility, "connections": store.connections}
+    patched = []
+    for module_name, module in list(sys.modules.items()):
+        if not module_name.startswith("dataset") or module is None:
+            continue
+        for attr, replacement in replacements.items():
+            if attr in vars(module):
+                patched.append((module, attr, vars(module)[attr]))
+                setattr(module, attr, replacement)
+    try:
+        yield store
+    finally:
+        for module, attr, original in patched:
+            setattr(module, attr, original)
@@ -0,0 +1,172 @@
+import argparse
+import contextlib
+import json
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+import dataset.cache
+import dataset.ratelimit
+from dataset.festival import indexing_festival_data
+from dataset.food import indexing_food_data
+from dataset.performance import indexing_performance_data
+from scripts.bench_fakes import FakeServer, memory_milvus
+
+# 인덱싱 처리량 벤치마크 (실제 Clova API / 원본 API / Milvus 없이 로컬에서 실행)
+# 사용법: python -m scripts.bench_indexing food --items 5000 --embed-latency 0.03 --rate-429 0.02
+#        python -m scripts.bench_indexing festival --runs 2 --delta --changed 0.1 --json result.json
+
+INDEXERS = {
+    "food": indexing_food_data,
+    "festival": indexing_festival_data,
+    "performance": indexing_performance_data
+}
+
+
+# 로컬 대역 서버를 가리키도록 환경 변수 설정 (모듈 import 시 load_dotenv 이후에 덮어씀)
+def configure_environment(server, args, cache_dir):
+    os.environ.update({
+        "FOOD_URL": f"{server.url}/food",
+        "FESTIVAL_URL": f"{server.url}/festival",
+        "PERFORMANCE_URL": f"{server.url}/performance",
+        "CLOVASTUDIO_EMBEDDING_HOST": server.url,
+        "CLOVASTUDIO_EMBEDDING_URL": "/embedding",
+        "CLOVASTUDIO_EMBEDDING_API_KEY": "bench",
+        "CLOVASTUDIO_EMBEDDING_APIGW_API_KEY": "bench",
+        "CLOVASTUDIO_EMBEDDING_REQUEST_ID": "bench",
+        "EMBEDDING_CACHE_PATH": os.path.join(cache_dir, "embedding_cache.sqlite3"),
+        "CHECKPOINT_DIR": os.path.join(cache_dir, "checkpoints"),
+        "RETRY_QUEUE_PATH": os.path.join(cache_dir, "retry_queue.sqlite3"),
+        "EMBEDDING_RPS": str(args.rps),
+        "EMBEDDING_MAX_IN_FLIGHT": str(args.in_flight),
+        "MILVUS_PORT": "0",
+        "PLACES_LAYOUT": "separate",
+        "SNAPSHOT_EXPORT": "false"
+    })
+
+
+# 실행마다 토큰 버킷 (및 선택적으로 임베딩 캐시) 초기화
+def reset_singletons(fresh_cache, cache_dir, run):
+    dataset.ratelimit._embedding_rate_limiter = None
+    if fresh_cache:
+        if dataset.cache._embedding_cache is not None:
+            dataset.cache._embedding_cache.close()
+        dataset.cache._embedding_cache = None
+        os.environ["EMBEDDING_CACHE_PATH"] = os.path.join(cache_dir, f"embedding_cache_{run}.sqlite3")
+
+
+def run_once(name, args, server, store, run):
+    delta = args.delta and run > 0
+    requests_before = server.stats()
+    output = open(os.devnull, "w") if args.quiet else None
+
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if output is not None:
+            stack.enter_context(output)
+            stack.enter_context(contextlib.redirect_stdout(output))
+            stack.enter_context(contextlib.redirect_stderr(output))
+        stats = INDEXERS[name](batch_size=args.page_size, delta=delta)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+    if args.trace_memory:
+        tracemalloc.stop()
+
+    fetched = stats["fetch"].items
+    return {
+        "run": run + 1,
+        "mode": "delta" if delta else "full",
+        "seconds": elapsed,
+        "fetched": fetched,
+        "embedded": stats["embed"].items,
+        "inserted": stats["insert"].items,
+        "items_per_second": fetched / elapsed if elapsed else 0.0,
+        "stages": {
+            stage.name: {
+                "busy_seconds": stage.busy_seconds,
+                "items_per_second": stage.items / stage.busy_seconds if stage.busy_seconds else 0.0,
+                "queue_avg": stage.queue_depth_total / stage.batches if stage.batches else 0.0,
+                "queue_max": stage.queue_depth_max
+            }
+            for stage in stats.values()
+        },
+        **{key: value - requests_before[key] for key, value in server.stats().items()},
+        "cache": dataset.cache.get_embedding_cache().stats(),
+        "stored_rows": sum(collection.num_entities for collection in store.collections.values()),
+        "peak_traced_mb": peak / 1024 / 1024 if peak is not None else None,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+
+def print_report(result):
+    print(
+        f"\n[run {result['run']} / {result['mode']}] {result['seconds']:.2f}s, "
+        f"{result['items_per_second']:.1f} items/s "
+        f"(fetched {result['fetched']}, embedded {result['embedded']}, inserted {result['inserted']})"
+    )
+    for name, stage in result["stages"].items():
+        print(
+            f"  {name:>7}: busy {stage['busy_seconds']:7.2f}s  {stage['items_per_second']:8.1f} items/s  "
+            f"queue avg {stage['queue_avg']:.1f} / max {stage['queue_max']}"
+        )
+    print(
+        f"  embedding API {result['embed_requests']}건 (429: {result['rate_limited']}), "
+        f"원본 API {result['source_requests']}건, 캐시 hit_rate {result['cache']['hit_rate']:.1%}, "
+        f"저장된 행 {result['stored_rows']}"
+    )
+    traced = f"{result['peak_traced_mb']:.1f} MB" if result["peak_traced_mb"] is not None else "-"
+    print(f"  peak memory: traced {traced}, max RSS {result['max_rss_mb']:.1f} MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="로컬 대역 서버를 사용한 인덱싱 처리량 벤치마크")
+    parser.add_argument("name", choices=sorted(INDEXERS), help="인덱서 종류")
+    parser.add_argument("--items", type=int, default=2000, help="원본 데이터 항목 수")
+    parser.add_argument("--page-size", type=int, default=500, help="원본 API 페이지 크기 (batch_size)")
+    parser.add_argument("--source-latency", type=float, default=0.05, help="원본 API 응답 지연 (초)")
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="임베딩 API 응답 지연 (초)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="임베딩 API 429 응답 비율 (0~1)")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="429 응답의 Retry-After (초)")
+    parser.add_argument("--rps", type=float, default=200, help="EMBEDDING_RPS")
+    parser.add_argument("--in-flight", type=int, default=8, help="EMBEDDING_MAX_IN_FLIGHT")
+    parser.add_argument("--runs", type=int, default=1, help="연속 실행 횟수")
+    parser.add_argument("--delta", action="store_true", help="두 번째 실행부터 delta 모드")
+    parser.add_argument("--changed", type=float, default=0.0, help="실행마다 내용이 바뀌는 항목 비율 (0~1)")
+    parser.add_argument("--keep-cache", action="store_true", help="실행 간 임베딩 캐시 유지")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false",
+                        help="tracemalloc 끄기 (측정 오버헤드 제거, max RSS 만 보고)")
+    parser.add_argument("--quiet", action="store_true", help="인덱서 로그 숨기기")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장 (변경 전후 비교용)")
+    args = parser.parse_args()
+
+    server = FakeServer(
+        items=args.items,
+        source_latency=args.source_latency,
+        embed_latency=args.embed_latency,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        changed_ratio=args.changed
+    ).start()
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir, memory_milvus() as store:
+        configure_environment(server, args, cache_dir)
+        try:
+            for run in range(args.runs):
+                reset_singletons(not args.keep_cache, cache_dir, run)
+                if run > 0:
+                    server.next_revision()
+                result = run_once(args.name, args, server, store, run)
+                results.append(result)
+                print_report(result)
+        finally:
+            dataset.cache.get_embedding_cache().close()
+            server.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"name": args.name, "args": vars(args), "runs": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.json}")
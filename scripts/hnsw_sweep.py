@@ -0,0 +1,60 @@
+import argparse
+import json
+from dataset.food import connect_to_milvus
+from dataset.indexconfig import get_index_config_path, save_index_config
+from dataset.snapshot import get_snapshot
+from dataset.tuning import (choose_params, config_entry, exact_ground_truth, format_sweep_row, split_queries,
+                            sweep_hnsw)
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",")]
+
+
+# 사용법: python -m scripts.hnsw_sweep food_hereforus --m 8,16,32 --ef-construction 100,200 --ef 16,32,64,128
+# 측정 결과 중 선택한 조합을 index_config.json (INDEX_CONFIG_PATH) 에 기록 → 인덱서 / 검색이 사용
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="스냅샷 임베딩으로 HNSW M / efConstruction / ef 측정")
+    parser.add_argument("name", help="스냅샷 이름 (예: food_hereforus)")
+    parser.add_argument("--config-key", help="설정 파일에 기록할 컬렉션 이름 (기본값: 스냅샷 이름)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--max-vectors", type=int, help="측정에 사용할 최대 벡터 수")
+    parser.add_argument("--m", type=int_list, default=[8, 16, 32])
+    parser.add_argument("--ef-construction", type=int_list, default=[100, 200, 400])
+    parser.add_argument("--ef", type=int_list, default=[16, 32, 64, 128, 256])
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--output", help="설정 파일 경로 (기본값: INDEX_CONFIG_PATH)")
+    parser.add_argument("--dry-run", action="store_true", help="측정만 하고 설정 파일은 바꾸지 않음")
+    parser.add_argument("--json", help="전체 측정 결과 저장 경로")
+    args = parser.parse_args()
+
+    snapshot = get_snapshot(args.name)
+    if snapshot is None:
+        raise SystemExit(f"스냅샷 '{args.name}'이 없습니다.")
+    if snapshot.encoding != "float32":
+        print(f"경고: 스냅샷 인코딩이 {snapshot.encoding} 이므로 양자화된 벡터로 측정합니다.")
+
+    base, queries = split_queries(snapshot.vectors(), args.queries, args.max_vectors)
+    ground_truth = exact_ground_truth(base, queries, args.k)
+    print(f"{args.name}: 벡터 {len(base)}건, query {len(queries)}건, k={args.k} (정답: NumPy 전수 검색)")
+
+    connect_to_milvus()
+    rows = sweep_hnsw(base, queries, ground_truth, args.m, args.ef_construction, args.ef, args.k)
+    if not rows:
+        raise SystemExit(f"측정 결과가 없습니다 (ef 는 k={args.k} 이상이어야 합니다).")
+
+    best = choose_params(rows, args.target_recall)
+    if best["recall"] < args.target_recall:
+        print(f"경고: recall@{args.k} {args.target_recall} 을 넘는 조합이 없어 recall 이 가장 높은 조합을 선택합니다.")
+    print(f"선택: {format_sweep_row(best, args.k)}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"name": args.name, "k": args.k, "rows": rows, "selected": best}, f, indent=2)
+
+    if not args.dry_run:
+        key = args.config_key or args.name
+        output = args.output or get_index_config_path()
+        save_index_config(key, config_entry(best, args.k, args.target_recall, len(base), len(queries)), output)
+        print(f"'{output}'의 {key} 항목을 갱신했습니다. 인덱스 파라미터는 다음 전체 재구축부터 적용됩니다.")
@@ -0,0 +1,24 @@
+import argparse
+from dataset.quantization import recall_report
+from dataset.snapshot import get_snapshot
+
+# 사용법: python -m scripts.quantization_report food_hereforus --k 10 --queries 200
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="스냅샷 임베딩 양자화 recall 비교")
+    parser.add_argument("name", help="스냅샷 이름 (예: food_hereforus)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    snapshot = get_snapshot(args.name)
+    if snapshot is None:
+        raise SystemExit(f"스냅샷 '{args.name}'이 없습니다.")
+    if snapshot.encoding != "float32":
+        print(f"경고: 스냅샷 인코딩이 {snapshot.encoding} 이므로 기준값도 양자화된 값입니다.")
+
+    print(f"{args.name}: {len(snapshot)}건, k={args.k}, queries={args.queries}")
+    for row in recall_report(snapshot.vectors(), k=args.k, num_queries=args.queries):
+        print(
+            f"{row['encoding']:>8}  {row['bytes_per_vector']:>5} B/vector  "
+            f"{row['total_mb']:8.1f} MB  recall@{args.k}={row[f'recall@{args.k}']:.4f}"
+        )
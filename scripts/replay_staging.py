@@ -0,0 +1,35 @@
+import argparse
+from dataset import festival, food, performance
+from dataset.bulkload import replay_staging
+from dataset.indexconfig import get_index_params
+from dataset.registry import bump_data_version
+from dataset.snapshot import export_snapshot, is_snapshot_export_enabled
+
+INDEXERS = {
+    "food_hereforus": food,
+    "festival_hereforus": festival,
+    "performance_hereforus": performance
+}
+
+# 사용법: python -m scripts.replay_staging food_hereforus [staging 디렉터리] --method insert
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="staging 파일로 재임베딩 없이 컬렉션 재적재")
+    parser.add_argument("alias", choices=sorted(INDEXERS))
+    parser.add_argument("directory", nargs="?", help="staging 디렉터리 (기본값: 가장 최근)")
+    parser.add_argument("--method", choices=["bulk", "insert"], default="bulk")
+    args = parser.parse_args()
+
+    indexer = INDEXERS[args.alias]
+    indexer.connect_to_milvus()
+    try:
+        collection = replay_staging(
+            args.alias, indexer.fields, get_index_params(args.alias), args.directory, args.method,
+            num_partitions=food.get_food_num_partitions() if indexer is food else None
+        )
+    except FileNotFoundError as e:
+        raise SystemExit(str(e))
+    print(f"{args.alias}: '{collection.name}' {collection.num_entities}건 적재 완료")
+
+    if is_snapshot_export_enabled():
+        export_snapshot(collection, args.alias)
+    bump_data_version(args.alias)